@@ -0,0 +1,71 @@
+MAX_CHUNK_CHARS = 4500  # limite d'une requête de traduction (5000 caractères)
+
+
+def build_chunks(texts, max_chars=MAX_CHUNK_CHARS):
+    """Regroupe les textes sur une ligne en lots joints par des sauts de ligne
+
+    Les textes multi-lignes (instructions) forment chacun leur propre lot.
+    """
+    chunks = []
+    current = []
+    length = 0
+    for text in texts:
+        if "\n" in text or len(text) >= max_chars:
+            chunks.append([text])
+            continue
+        if current and length + len(text) + 1 > max_chars:
+            chunks.append(current)
+            current = []
+            length = 0
+        current.append(text)
+        length += len(text) + 1
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _translate_chunk(translate, chunk, src, dest):
+    """Traduit un lot en un seul appel, ou texte par texte si le découpage échoue"""
+    if len(chunk) == 1:
+        return [translate(chunk[0], src, dest)]
+    lines = translate("\n".join(chunk), src, dest).split("\n")
+    if len(lines) == len(chunk):
+        return [line.strip() for line in lines]
+    return [translate(text, src, dest) for text in chunk]
+
+
+def translate_segments(translate, segments, src, dest, cache=None, executor=None, pinned=False,
+                       max_chars=MAX_CHUNK_CHARS):
+    """Traduit une liste de segments en un minimum d'appels, dans l'ordre
+
+    Seuls les segments absents du cache sont envoyés ; les lots sont répartis
+    sur l'exécuteur fourni puis réassemblés dans l'ordre d'origine.
+    """
+    results = list(segments)
+    missing = {}
+    for index, text in enumerate(segments):
+        if not text or not text.strip():
+            continue
+        cached = cache.get(src, dest, text) if cache is not None else None
+        if cached is not None:
+            results[index] = cached
+        else:
+            missing.setdefault(text, []).append(index)
+
+    if not missing:
+        return results
+
+    chunks = build_chunks(list(missing), max_chars)
+    if executor is not None and len(chunks) > 1:
+        futures = [executor.submit(_translate_chunk, translate, chunk, src, dest) for chunk in chunks]
+        translated_chunks = [future.result() for future in futures]
+    else:
+        translated_chunks = [_translate_chunk(translate, chunk, src, dest) for chunk in chunks]
+
+    for chunk, translated in zip(chunks, translated_chunks):
+        for text, translation in zip(chunk, translated):
+            if cache is not None:
+                cache.put(src, dest, text, translation, pinned=pinned)
+            for index in missing[text]:
+                results[index] = translation
+    return results
@@ -0,0 +1,194 @@
+import hashlib
+import json
+import sqlite3
+import string
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from metrics import metrics
+
+THEMEALDB_SEARCH_URL = "https://www.themealdb.com/api/json/v1/1/search.php"
+
+
+class CatalogMirror:
+    """Copie locale (SQLite) du catalogue TheMealDB, synchronisée par lettre
+
+    La synchronisation parcourt search.php?f=<lettre> avec un nombre borné de
+    requêtes simultanées. Chaque lettre est revalidée par ETag/Last-Modified
+    et seules les recettes nouvelles ou modifiées sont réécrites. Une
+    synchronisation interrompue reprend aux lettres non traitées.
+    """
+
+    def __init__(self, db_path="catalog.db", url=THEMEALDB_SEARCH_URL, letters=string.ascii_lowercase):
+        self.db_path = db_path
+        self.url = url
+        self.letters = letters
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS meals
+                (id TEXT PRIMARY KEY,
+                 letter TEXT,
+                 title TEXT,
+                 data TEXT,
+                 digest TEXT,
+                 updated_at REAL);
+            CREATE INDEX IF NOT EXISTS meals_letter ON meals (letter);
+            CREATE TABLE IF NOT EXISTS letters
+                (letter TEXT PRIMARY KEY,
+                 etag TEXT,
+                 last_modified TEXT,
+                 digest TEXT,
+                 synced_at REAL,
+                 run_id REAL);
+            CREATE TABLE IF NOT EXISTS sync_state
+                (name TEXT PRIMARY KEY,
+                 value TEXT);
+        ''')
+        self._conn.commit()
+
+    def _state(self, name):
+        row = self._conn.execute('SELECT value FROM sync_state WHERE name = ?', (name,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, name, value):
+        if value is None:
+            self._conn.execute('DELETE FROM sync_state WHERE name = ?', (name,))
+        else:
+            self._conn.execute('INSERT OR REPLACE INTO sync_state VALUES (?, ?)', (name, str(value)))
+
+    def is_synced(self):
+        """Indique si une synchronisation complète a déjà abouti"""
+        with self._lock:
+            return self._state("last_sync") is not None
+
+    def sync(self, fetch=None, max_workers=4, timeout=10, progress=None):
+        """Synchronise le catalogue et renvoie le nombre de recettes ajoutées ou modifiées
+
+        progress(lettres traitées, total) est appelé après chaque lettre.
+        """
+        if fetch is None:
+            import requests
+            fetch = requests.get
+        with self._lock:
+            run_id = self._state("run_id")
+            if run_id is None:
+                run_id = str(time.time())
+                self._set_state("run_id", run_id)
+                self._conn.commit()
+            done = {row[0] for row in self._conn.execute(
+                'SELECT letter FROM letters WHERE run_id = ?', (float(run_id),))}
+
+        pending = [letter for letter in self.letters if letter not in done]
+        completed = len(self.letters) - len(pending)
+        changed = 0
+        if progress:
+            progress(completed, len(self.letters))
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="chefai-sync") as pool:
+            futures = [pool.submit(self._sync_letter, fetch, letter, float(run_id), timeout)
+                       for letter in pending]
+            for future in as_completed(futures):
+                changed += future.result()
+                completed += 1
+                if progress:
+                    progress(completed, len(self.letters))
+
+        with self._lock:
+            self._set_state("run_id", None)
+            self._set_state("last_sync", time.time())
+            self._conn.commit()
+        return changed
+
+    def _sync_letter(self, fetch, letter, run_id, timeout):
+        """Synchronise une lettre ; renvoie le nombre de recettes réécrites"""
+        with self._lock:
+            row = self._conn.execute('SELECT etag, last_modified, digest FROM letters WHERE letter = ?',
+                                     (letter,)).fetchone()
+        headers = {}
+        if row:
+            if row[0]:
+                headers["If-None-Match"] = row[0]
+            if row[1]:
+                headers["If-Modified-Since"] = row[1]
+
+        response = fetch(self.url, params={"f": letter}, headers=headers, timeout=timeout)
+        now = time.time()
+        if response.status_code == 304 and row:
+            with self._lock:
+                self._conn.execute('UPDATE letters SET synced_at = ?, run_id = ? WHERE letter = ?',
+                                   (now, run_id, letter))
+                self._conn.commit()
+            return 0
+        response.raise_for_status()
+
+        letter_digest = hashlib.sha256(response.content).hexdigest()
+        changed = 0
+        with self._lock, metrics.span("sqlite.write", table="meals"):
+            if not row or row[2] != letter_digest:
+                meals = response.json().get("meals") or []
+                known = dict(self._conn.execute('SELECT id, digest FROM meals WHERE letter = ?', (letter,)))
+                for meal in meals:
+                    data = json.dumps(meal, sort_keys=True, ensure_ascii=False)
+                    digest = hashlib.sha256(data.encode("utf-8")).hexdigest()
+                    if known.pop(meal["idMeal"], None) != digest:
+                        self._conn.execute('INSERT OR REPLACE INTO meals VALUES (?, ?, ?, ?, ?, ?)',
+                                           (meal["idMeal"], letter, meal["strMeal"], data, digest, now))
+                        changed += 1
+                # Recettes retirées du catalogue
+                self._conn.executemany('DELETE FROM meals WHERE id = ?', [(meal_id,) for meal_id in known])
+
+            self._conn.execute('INSERT OR REPLACE INTO letters VALUES (?, ?, ?, ?, ?, ?)',
+                               (letter, response.headers.get("ETag"), response.headers.get("Last-Modified"),
+                                letter_digest, now, run_id))
+            self._conn.commit()
+        return changed
+
+    @staticmethod
+    def _like_pattern(query):
+        """Motif LIKE « contient », caractères spéciaux échappés"""
+        return "%" + query.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+    def search(self, query):
+        """Recherche par nom comme search.php?s=, au format TheMealDB"""
+        pattern = self._like_pattern(query)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM meals WHERE title LIKE ? ESCAPE '\\' ORDER BY title",
+                (pattern,)).fetchall()
+        return {"meals": [json.loads(row[0]) for row in rows] or None}
+
+    def search_summaries(self, query):
+        """Comme search, mais seulement idMeal, strMeal et strMealThumb"""
+        pattern = self._like_pattern(query)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, title, json_extract(data, '$.strMealThumb') FROM meals "
+                "WHERE title LIKE ? ESCAPE '\\' ORDER BY title",
+                (pattern,)).fetchall()
+        return [{"idMeal": row[0], "strMeal": row[1], "strMealThumb": row[2]} for row in rows]
+
+    def get(self, meal_id):
+        """Recette du catalogue par id, au format TheMealDB, ou None"""
+        with self._lock:
+            row = self._conn.execute('SELECT data FROM meals WHERE id = ?', (meal_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def iter_meals(self, since=None):
+        """Parcourt les recettes du catalogue, au format TheMealDB
+
+        Avec since (horodatage), seules les recettes écrites depuis sont lues.
+        """
+        with self._lock:
+            if since is None:
+                rows = self._conn.execute('SELECT data FROM meals').fetchall()
+            else:
+                rows = self._conn.execute('SELECT data FROM meals WHERE updated_at >= ?', (since,)).fetchall()
+        for (data,) in rows:
+            yield json.loads(data)
+
+    def close(self):
+        """Ferme la connexion SQLite"""
+        with self._lock:
+            self._conn.close()
@@ -1,14 +1,61 @@
+import time
+
+_PROCESS_START = time.perf_counter()
+
+import argparse
+import json
+import os
 import tkinter as tk
 from tkinter import messagebox, ttk
-import requests
-import sqlite3
-from io import BytesIO
-from PIL import Image, ImageTk
-from googletrans import Translator
-from threading import Thread
+from concurrent.futures import ThreadPoolExecutor
+from chefai_core import ChefCore, normalize_text, recipe_key
+from metrics import metrics
+from prefetch import PrefetchScheduler
+from single_flight import SingleFlight
+from virtual_list import VirtualList
+
+
+_IMPORTS_DONE = time.perf_counter()
+
+
+def build_style_set(colors):
+    """Styles ttk d'un thème : {style: (options de configure, options de map)}"""
+    return {
+        '.': ({"background": colors["bg"]}, {}),
+        'TFrame': ({"background": colors["bg"]}, {}),
+        'TLabel': ({"background": colors["bg"], "foreground": colors["text"]}, {}),
+        'TButton': ({"padding": 8, "font": ('Helvetica', 10, 'bold')}, {}),
+        'TEntry': ({"padding": 8, "fieldbackground": colors["widget_bg"]}, {}),
+        'TLabelframe': ({"background": colors["bg"], "foreground": colors["primary"]}, {}),
+        'TLabelframe.Label': ({"background": colors["bg"], "foreground": colors["primary"]}, {}),
+        'TNotebook': ({"background": colors["bg"]}, {}),
+        'TNotebook.Tab': ({"background": colors["bg"], "padding": [10, 5], "foreground": colors["text"]}, {}),
+        'TRadiobutton': ({"background": colors["bg"], "foreground": colors["text"]}, {}),
+        'TCheckbutton': ({"background": colors["bg"], "foreground": colors["text"]}, {}),
+        # Styles pour les boutons
+        'Primary.TButton': ({"foreground": 'white', "background": colors["primary"], "borderwidth": 1},
+                            {"foreground": [('active', 'white')], "background": [('active', colors["primary"])]}),
+        'Secondary.TButton': ({"foreground": colors["text"], "background": colors["bg"], "borderwidth": 1},
+                              {"foreground": [('active', 'white')], "background": [('active', colors["secondary"])]}),
+        'Success.TButton': ({"foreground": 'white', "background": colors["success"], "borderwidth": 1},
+                            {"foreground": [('active', 'white')], "background": [('active', colors["success"])]}),
+    }
+
+
+def diff_style_sets(old, new):
+    """Options de new qui diffèrent de old : liste de (style, options de configure, options de map)"""
+    changes = []
+    for name, (options, maps) in new.items():
+        old_options, old_maps = old.get(name, ({}, {}))
+        options = {key: value for key, value in options.items() if old_options.get(key) != value}
+        maps = {key: value for key, value in maps.items() if old_maps.get(key) != value}
+        if options or maps:
+            changes.append((name, options, maps))
+    return changes
+
 
 class ChefAI:
-    def __init__(self, root):
+    def __init__(self, root, fast_start=False, on_startup=None, data_dir=""):
         self.root = root
         self.root.title("ChefAI - Intelligent Culinary Assistant")
         self.root.geometry("1100x800")
@@ -17,18 +64,54 @@ class ChefAI:
         self.current_language = "en"
         self.dark_mode = False
         self.current_recipe = None
-        self.current_api = "themealdb"  # 'themealdb' ou 'edamam'
-        self.favorites_db = "favorites.db"
-        self.translator = Translator()
-        self.translation_cache = {}
-        
-        # Clés API (à remplacer par vos propres clés)
-        self.api_keys = {
-            "edamam": {
-                "app_id": "YOUR_EDAMAM_APP_ID",
-                "app_key": "YOUR_EDAMAM_APP_KEY"
-            }
-        }
+        self._requested_recipe = None  # recette attendue dans le panneau de détails
+        self.recipes = []
+        self.similar_recipes = []
+        self.similar_count = 10
+        self.current_api = "themealdb"  # 'themealdb', 'edamam' ou 'all'
+        self.favorites_db = os.path.join(data_dir, "favorites.db")
+        self.fast_start = fast_start  # panneau de détails et bases chargés à la demande
+        self.on_startup = on_startup
+        self.startup_times = {"imports": _IMPORTS_DONE - _PROCESS_START}
+        self.core = ChefCore(data_dir=os.path.dirname(self.favorites_db))
+        self.image_cache = self.core.image_cache
+        
+        # Recherche en arrière-plan
+        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="chefai")
+        self.image_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="chefai-image")
+        # Recherches, images et traductions identiques en cours : un seul calcul partagé
+        self.flights = SingleFlight(self.executor)
+        self._image_future = None
+        self._translation_future = None
+        self.search_generation = 0
+        self.search_futures = []
+        self.provider_deadline = 8000  # ms, délai maximal par fournisseur en mode "all"
+        self.live_search_delay = 400  # ms
+        self.favorites_query = None
+        self.favorites_page = 0
+        self.favorites_has_more = False
+        self.pager = None  # pagination Edamam de la recherche en cours
+        self._page_loading = False
+        self._live_search_job = None
+        self._last_search_text = ""  # saisie déjà traitée par on_search_key
+        self._search_started = None
+        self.suggest_providers = ("themealdb", "edamam", "all")  # suggestions locales de titres
+        self.suggest_count = 10
+        self._local_hits = []  # suggestions affichées en fin de liste, fusionnées aux résultats
+        
+        # Préchargement des miniatures (et traductions) pendant les temps morts
+        self.prefetch_count = 12  # recettes préchargées autour de la sélection
+        self.prefetch_delay = 300  # ms d'inactivité avant de reprendre
+        self.prefetch_translations = False
+        self.prefetcher = PrefetchScheduler(
+            max_running=1, has_capacity=lambda provider: self.core.http.has_capacity(provider)
+        )
+        self._prefetch_job = None
+        
+        # Panneau des mesures de performance
+        self.stats_window = None
+        self.stats_refresh = 1000  # ms
+        self._stats_job = None
         
         # Thèmes
         self.themes = {
@@ -81,8 +164,20 @@ class ChefAI:
                 "dark_mode": "Dark Mode",
                 "light_mode": "Light Mode",
                 "api_select": "API Source:",
+                "live_search": "Live search",
                 "themealdb": "TheMealDB",
-                "edamam": "Edamam"
+                "edamam": "Edamam",
+                "favorites": "Favorites",
+                "pantry": "What I have",
+                "all": "All sources",
+                "sync": "Sync catalog",
+                "sync_done": "Catalog synchronized",
+                "sync_error": "Catalog sync failed",
+                "stats": "Performance",
+                "reset": "Reset",
+                "export_error": "Export failed",
+                "similar": "Similar recipes",
+                "shopping": "Shopping list"
             },
             "fr": {
                 "search": "Recherche de Recettes",
@@ -101,74 +196,89 @@ class ChefAI:
                 "dark_mode": "Mode Sombre",
                 "light_mode": "Mode Clair",
                 "api_select": "Source API :",
+                "live_search": "Recherche instantanée",
                 "themealdb": "TheMealDB",
-                "edamam": "Edamam"
+                "edamam": "Edamam",
+                "favorites": "Favoris",
+                "pantry": "Ce que j'ai",
+                "all": "Toutes les sources",
+                "sync": "Synchroniser le catalogue",
+                "sync_done": "Catalogue synchronisé",
+                "sync_error": "Échec de la synchronisation",
+                "stats": "Performances",
+                "reset": "Réinitialiser",
+                "export_error": "Échec de l'export",
+                "similar": "Recettes similaires",
+                "shopping": "Liste de courses"
             }
         }
         
+        # Styles et libellés précalculés : un changement de thème ou de langue
+        # n'applique que les options et les textes qui diffèrent
+        style_sets = {name: build_style_set(colors) for name, colors in self.themes.items()}
+        self.style_diffs = {(old, new): diff_style_sets(style_sets.get(old, {}), style_sets[new])
+                            for old in [None, *style_sets] for new in style_sets if old != new}
+        self.changed_labels = {key for key, text in self.texts["en"].items() if self.texts["fr"][key] != text}
+        self.placeholders = frozenset(texts["placeholder"] for texts in self.texts.values())
+        self._themed = []  # (groupe, widget, {option: couleur du thème})
+        self._localized = []  # (groupe, fonction d'affichage, clé de libellé)
+        self._applied_theme = None
+        self._applied_language = None
+        
         # Initialisation
-        self.init_database()
-        self.configure_styles()
         self.create_widgets()
+        if not fast_start:
+            self.create_details_pane()
         self.update_ui()
+        
+        self.startup_times["init"] = time.perf_counter() - _PROCESS_START
+        self.root.bind("<Map>", self._on_first_map, add="+")
+        if fast_start:
+            # Bases et dépendances lourdes ouvertes après le premier affichage
+            self.root.after_idle(lambda: self.executor.submit(self.core.warm_up))
+        # Index locaux (titres, garde-manger, recettes similaires) construits en arrière-plan
+        self.root.after_idle(lambda: self.executor.submit(self.core.load_local_indexes))
     
-    def init_database(self):
-        """Initialise la base de données SQLite"""
-        conn = sqlite3.connect(self.favorites_db)
-        c = conn.cursor()
-        c.execute('''CREATE TABLE IF NOT EXISTS favorites
-                    (id TEXT PRIMARY KEY, 
-                     title TEXT, 
-                     ingredients TEXT, 
-                     instructions TEXT,
-                     image_url TEXT,
-                     source TEXT)''')
-        conn.commit()
-        conn.close()
+    def _on_first_map(self, event):
+        """Mesure le temps jusqu'au premier affichage de la fenêtre"""
+        if event.widget is not self.root or "first_paint" in self.startup_times:
+            return
+        self.root.update_idletasks()
+        self.startup_times["first_paint"] = time.perf_counter() - _PROCESS_START
+        if self.on_startup is not None:
+            self.on_startup(self)
     
     def configure_styles(self):
-        """Configure les styles ttk"""
+        """Applique le jeu de styles ttk du thème courant : seules les options qui changent"""
         style = ttk.Style()
-        style.theme_use('clam')
-        
-        current_theme = "dark" if self.dark_mode else "light"
-        colors = self.themes[current_theme]
-        
-        style.configure('.', background=colors["bg"])
-        style.configure('TFrame', background=colors["bg"])
-        style.configure('TLabel', background=colors["bg"], foreground=colors["text"])
-        style.configure('TButton', padding=8, font=('Helvetica', 10, 'bold'))
-        style.configure('TEntry', padding=8, fieldbackground=colors["widget_bg"])
-        style.configure('TLabelframe', background=colors["bg"], foreground=colors["primary"])
-        style.configure('TLabelframe.Label', background=colors["bg"], foreground=colors["primary"])
-        style.configure('TNotebook', background=colors["bg"])
-        style.configure('TNotebook.Tab', background=colors["bg"], padding=[10, 5], foreground=colors["text"])
-        style.configure('TRadiobutton', background=colors["bg"], foreground=colors["text"])
-        
-        # Styles pour les boutons
-        style.configure('Primary.TButton', 
-                      foreground='white',
-                      background=colors["primary"],
-                      borderwidth=1)
-        style.map('Primary.TButton',
-                 foreground=[('active', 'white')],
-                 background=[('active', colors["primary"])])
-        
-        style.configure('Secondary.TButton', 
-                       foreground=colors["text"],
-                       background=colors["bg"],
-                       borderwidth=1)
-        style.map('Secondary.TButton',
-                 foreground=[('active', 'white')],
-                 background=[('active', colors["secondary"])])
-        
-        style.configure('Success.TButton', 
-                       foreground='white',
-                       background=colors["success"],
-                       borderwidth=1)
-        style.map('Success.TButton',
-                 foreground=[('active', 'white')],
-                 background=[('active', colors["success"])])
+        if self._applied_theme is None:
+            style.theme_use('clam')
+        for name, options, maps in self.style_diffs[self._applied_theme, self.theme_name()]:
+            if options:
+                style.configure(name, **options)
+            if maps:
+                style.map(name, **maps)
+    
+    def theme_name(self):
+        return "dark" if self.dark_mode else "light"
+    
+    def theme_widget(self, widget, group=None, **options):
+        """Enregistre des couleurs propres à un widget (option=clé de couleur du thème)"""
+        self._themed.append((group, widget, options))
+        if self._applied_theme is not None:
+            colors = self.themes[self._applied_theme]
+            widget.config(**{option: colors[key] for option, key in options.items()})
+    
+    def localize(self, show, key, group=None):
+        """Enregistre un libellé : show(texte) l'affiche dans la langue de l'interface"""
+        self._localized.append((group, show, key))
+        if self._applied_language is not None:
+            show(self.texts[self._applied_language][key])
+    
+    def forget_group(self, group):
+        """Oublie les widgets d'une fenêtre fermée"""
+        self._themed = [entry for entry in self._themed if entry[0] != group]
+        self._localized = [entry for entry in self._localized if entry[0] != group]
     
     def create_widgets(self):
         """Crée l'interface utilisateur"""
@@ -189,7 +299,8 @@ class ChefAI:
         api_frame = ttk.Frame(toolbar_frame)
         api_frame.pack(side=tk.LEFT, padx=10)
         
-        ttk.Label(api_frame, text=self.texts[self.current_language]["api_select"]).pack(side=tk.LEFT)
+        api_label = ttk.Label(api_frame, text=self.texts[self.current_language]["api_select"])
+        api_label.pack(side=tk.LEFT)
         
         self.api_var = tk.StringVar(value=self.current_api)
         ttk.Radiobutton(
@@ -208,6 +319,33 @@ class ChefAI:
             command=self.change_api
         ).pack(side=tk.LEFT, padx=5)
         
+        self.favorites_radio = ttk.Radiobutton(
+            api_frame, 
+            text=self.texts[self.current_language]["favorites"],
+            variable=self.api_var, 
+            value="favorites",
+            command=self.change_api
+        )
+        self.favorites_radio.pack(side=tk.LEFT, padx=5)
+        
+        self.pantry_radio = ttk.Radiobutton(
+            api_frame, 
+            text=self.texts[self.current_language]["pantry"],
+            variable=self.api_var, 
+            value="pantry",
+            command=self.change_api
+        )
+        self.pantry_radio.pack(side=tk.LEFT, padx=5)
+        
+        self.all_sources_radio = ttk.Radiobutton(
+            api_frame, 
+            text=self.texts[self.current_language]["all"],
+            variable=self.api_var, 
+            value="all",
+            command=self.change_api
+        )
+        self.all_sources_radio.pack(side=tk.LEFT, padx=5)
+        
         # Bouton de langue
         self.lang_btn = ttk.Button(
             toolbar_frame, 
@@ -217,6 +355,34 @@ class ChefAI:
         )
         self.lang_btn.pack(side=tk.RIGHT, padx=5)
         
+        # Synchronisation du catalogue local
+        self.sync_btn = ttk.Button(
+            toolbar_frame, 
+            text=self.texts[self.current_language]["sync"], 
+            command=self.sync_catalog, 
+            style='Secondary.TButton'
+        )
+        self.sync_btn.pack(side=tk.RIGHT, padx=5)
+        
+        # Panneau des mesures de performance
+        self.stats_btn = ttk.Button(
+            toolbar_frame, 
+            text=self.texts[self.current_language]["stats"], 
+            command=self.toggle_stats_panel, 
+            style='Secondary.TButton'
+        )
+        self.stats_btn.pack(side=tk.RIGHT, padx=5)
+        self.root.bind("<F12>", lambda e: self.toggle_stats_panel())
+        
+        # Liste de courses des favoris
+        self.shopping_btn = ttk.Button(
+            toolbar_frame, 
+            text=self.texts[self.current_language]["shopping"], 
+            command=self.show_shopping_list, 
+            style='Secondary.TButton'
+        )
+        self.shopping_btn.pack(side=tk.RIGHT, padx=5)
+        
         # Frame principal
         main_frame = ttk.Frame(self.root, padding=10)
         main_frame.pack(fill=tk.BOTH, expand=True)
@@ -237,13 +403,27 @@ class ChefAI:
             style='Primary.TButton'
         )
         self.search_btn.pack(side=tk.LEFT)
+        self.search_entry.bind("<KeyRelease>", self.on_search_key)
+        
+        self.live_search_var = tk.BooleanVar(value=False)
+        self.live_search_check = ttk.Checkbutton(
+            self.search_frame,
+            text=self.texts[self.current_language]["live_search"],
+            variable=self.live_search_var
+        )
+        self.live_search_check.pack(side=tk.LEFT, padx=5)
         
         # Liste des résultats
         current_theme = "dark" if self.dark_mode else "light"
         colors = self.themes[current_theme]
+        self.main_frame = main_frame
         
-        self.recipes_list = tk.Listbox(
+        # Seules les lignes visibles existent dans le Listbox
+        self.recipes_list = VirtualList(
             main_frame, 
+            label=self.recipe_label, 
+            on_select=self.show_recipe_details, 
+            on_scroll=self.on_list_scroll, 
             height=10, 
             bg=colors["listbox_bg"], 
             fg=colors["listbox_fg"], 
@@ -252,11 +432,34 @@ class ChefAI:
             selectforeground=colors["select_fg"]
         )
         self.recipes_list.pack(fill=tk.BOTH, pady=5, expand=True, padx=5)
-        self.recipes_list.bind('<<ListboxSelect>>', self.show_recipe_details)
+        self.details_frame = None
+        
+        # Couleurs et libellés mis à jour aux changements de thème et de langue
+        self.theme_widget(self.root, bg="bg")
+        self.theme_widget(self.recipes_list, bg="listbox_bg", fg="listbox_fg",
+                          selectbackground="select_bg", selectforeground="select_fg")
+        self.localize(self.root.title, "title")
+        self.localize(lambda text: api_label.config(text=text), "api_select")
+        self.localize(lambda text: self.search_frame.config(text=text), "search")
+        self.localize(lambda text: self.search_btn.config(text=text), "search_btn")
+        self.localize(lambda text: self.live_search_check.config(text=text), "live_search")
+        self.localize(lambda text: self.favorites_radio.config(text=text), "favorites")
+        self.localize(lambda text: self.pantry_radio.config(text=text), "pantry")
+        self.localize(lambda text: self.all_sources_radio.config(text=text), "all")
+        self.localize(self._show_sync_label, "sync")
+        self.localize(lambda text: self.stats_btn.config(text=text), "stats")
+        self.localize(lambda text: self.shopping_btn.config(text=text), "shopping")
+    
+    def create_details_pane(self):
+        """Crée le panneau de détails (image, titre, boutons, onglets)"""
+        if self.details_frame is not None:
+            return
+        colors = self.themes["dark" if self.dark_mode else "light"]
         
         # Détails de la recette
-        details_frame = ttk.Frame(main_frame)
+        details_frame = ttk.Frame(self.main_frame)
         details_frame.pack(fill=tk.BOTH, expand=True)
+        self.details_frame = details_frame
         
         # Image
         self.recipe_image = ttk.Label(details_frame)
@@ -331,219 +534,591 @@ class ChefAI:
         scroll_inst.pack(side=tk.RIGHT, fill=tk.Y)
         self.instructions_text.pack(fill=tk.BOTH, expand=True)
         self.notebook.add(instructions_frame, text=self.texts[self.current_language]["instructions"])
+        
+        # Onglet Recettes similaires (index local TF-IDF des ingrédients)
+        similar_frame = ttk.Frame(self.notebook)
+        self.similar_list = tk.Listbox(
+            similar_frame, 
+            bg=colors["listbox_bg"], 
+            fg=colors["listbox_fg"], 
+            selectbackground=colors["select_bg"], 
+            selectforeground=colors["select_fg"], 
+            font=('Helvetica', 11), 
+            exportselection=False
+        )
+        scroll_similar = ttk.Scrollbar(similar_frame, command=self.similar_list.yview)
+        self.similar_list.configure(yscrollcommand=scroll_similar.set)
+        scroll_similar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.similar_list.pack(fill=tk.BOTH, expand=True)
+        self.similar_list.bind("<<ListboxSelect>>", self.show_similar_recipe)
+        self.notebook.add(similar_frame, text=self.texts[self.current_language]["similar"])
+        
+        for widget in [self.ingredients_text, self.instructions_text]:
+            self.theme_widget(widget, bg="widget_bg", fg="text", insertbackground="text")
+        self.theme_widget(self.recipe_title, foreground="primary")
+        self.theme_widget(self.similar_list, bg="listbox_bg", fg="listbox_fg",
+                          selectbackground="select_bg", selectforeground="select_fg")
+        self.localize(lambda text: self.translate_btn.config(text=text), "translate")
+        self.localize(lambda text: self.save_btn.config(text=text), "save")
+        for tab, key in enumerate(["ingredients", "instructions", "similar"]):
+            self.localize(lambda text, tab=tab: self.notebook.tab(tab, text=text), key)
     
     def change_api(self):
         """Change l'API source"""
         self.current_api = self.api_var.get()
-        self.recipes_list.delete(0, tk.END)
+        self.cancel_search()
+        self.recipes = []
+        self.recipes_list.set_items(self.recipes)
         self.clear_recipe_details()
     
     def clear_recipe_details(self):
         """Efface les détails de la recette actuelle"""
+        self.current_recipe = None
+        if self.details_frame is None:
+            return
         self.recipe_title.config(text="")
         self.recipe_image.config(image="")
         self.recipe_image.image = None
         self.ingredients_text.config(state=tk.NORMAL)
         self.ingredients_text.delete(1.0, tk.END)
+        self.similar_recipes = []
+        self.similar_list.delete(0, tk.END)
         self.ingredients_text.config(state=tk.DISABLED)
         self.instructions_text.config(state=tk.NORMAL)
         self.instructions_text.delete(1.0, tk.END)
         self.instructions_text.config(state=tk.DISABLED)
-        self.current_recipe = None
     
     def toggle_theme(self):
         """Bascule entre le mode sombre et clair"""
         self.dark_mode = not self.dark_mode
-        self.update_ui()
+        self.apply_theme()
     
     def toggle_language(self):
         """Change la langue de l'interface"""
         self.current_language = "fr" if self.current_language == "en" else "en"
-        self.update_ui()
+        self.apply_language()
     
     def update_ui(self):
         """Met à jour toute l'interface"""
-        self.configure_styles()
-        current_theme = "dark" if self.dark_mode else "light"
-        colors = self.themes[current_theme]
-        
-        self.root.configure(bg=colors["bg"])
-        
-        # Mise à jour des widgets
-        self.recipes_list.config(
-            bg=colors["listbox_bg"],
-            fg=colors["listbox_fg"],
-            selectbackground=colors["select_bg"],
-            selectforeground=colors["select_fg"]
-        )
-        
-        for widget in [self.ingredients_text, self.instructions_text]:
-            widget.config(
-                bg=colors["widget_bg"],
-                fg=colors["text"],
-                insertbackground=colors["text"]
-            )
-        
-        self.recipe_title.config(foreground=colors["primary"])
-        self.theme_btn.config(
-            text=self.texts[self.current_language]["light_mode"] if self.dark_mode else self.texts[self.current_language]["dark_mode"]
-        )
-        
-        # Textes de l'interface
-        self.root.title(self.texts[self.current_language]["title"])
-        self.search_frame.config(text=self.texts[self.current_language]["search"])
-        self.search_btn.config(text=self.texts[self.current_language]["search_btn"])
-        self.translate_btn.config(text="Translate to French" if self.current_language == "en" else "Traduire en Français")
-        self.save_btn.config(text=self.texts[self.current_language]["save"])
-        self.notebook.tab(0, text=self.texts[self.current_language]["ingredients"])
-        self.notebook.tab(1, text=self.texts[self.current_language]["instructions"])
-        
-        # Placeholder
-        current_text = self.search_entry.get()
-        if current_text in [v["placeholder"] for v in self.texts.values()]:
-            self.search_entry.delete(0, tk.END)
-            self.search_entry.insert(0, self.texts[self.current_language]["placeholder"])
-    
-    def search_recipes(self):
-        """Recherche des recettes selon l'API sélectionnée"""
+        self.apply_theme()
+        self.apply_language()
+    
+    def apply_theme(self):
+        """Passe au thème courant en ne changeant que les styles et couleurs qui diffèrent"""
+        theme = self.theme_name()
+        if theme == self._applied_theme:
+            return
+        with metrics.span("ui.switch", kind="theme"):
+            self.configure_styles()
+            old = self.themes.get(self._applied_theme, {})
+            colors = self.themes[theme]
+            for _, widget, options in self._themed:
+                changed = {option: colors[key] for option, key in options.items() if old.get(key) != colors[key]}
+                if changed:
+                    widget.config(**changed)
+            self._applied_theme = theme
+            self._show_theme_label()
+    
+    def apply_language(self):
+        """Passe à la langue courante en ne changeant que les libellés qui diffèrent"""
+        language = self.current_language
+        if language == self._applied_language:
+            return
+        with metrics.span("ui.switch", kind="language"):
+            texts = self.texts[language]
+            for _, show, key in self._localized:
+                if self._applied_language is None or key in self.changed_labels:
+                    show(texts[key])
+            self._applied_language = language
+            self._show_theme_label()
+            self.recipes_list.refresh()  # libellés traduits (mode "all")
+            
+            # Placeholder
+            if self.search_entry.get() in self.placeholders:
+                self.search_entry.delete(0, tk.END)
+                self.search_entry.insert(0, texts["placeholder"])
+    
+    def _show_theme_label(self):
+        texts = self.texts[self._applied_language or self.current_language]
+        self.theme_btn.config(text=texts["light_mode"] if self.dark_mode else texts["dark_mode"])
+    
+    def _show_sync_label(self, text):
+        if str(self.sync_btn["state"]) != tk.DISABLED:
+            self.sync_btn.config(text=text)
+    
+    def search_recipes(self, live=False):
+        """Recherche des recettes selon l'API sélectionnée, hors du thread Tk"""
         query = self.search_entry.get().strip()
         if not query or query == self.texts[self.current_language]["placeholder"]:
-            messagebox.showwarning(
-                self.texts[self.current_language]["search_error"], 
-                self.texts[self.current_language]["search_error"]
-            )
+            if not live:
+                messagebox.showwarning(
+                    self.texts[self.current_language]["search_error"], 
+                    self.texts[self.current_language]["search_error"]
+                )
+            return
+        
+        self.user_activity()
+        generation = self.cancel_search()
+        self._search_started = time.perf_counter()
+        self.favorites_query = query
+        self.favorites_page = 0
+        self.favorites_has_more = False
+        self.show_suggestions(query)
+        if self.current_api == "all":
+            self._start_federated_search(generation, query, live)
             return
         
-        if self.current_api == "themealdb":
-            self.search_themealdb(query)
+        if self.current_api == "edamam":
+            self.pager = self.core.edamam_pager(query, executor=self.executor)
+            self._page_loading = True  # première page : pas de seconde demande au défilement
+            future = self.executor.submit(self.pager.fetch_next)
         else:
-            self.search_edamam(query)
+            future = self.flights.submit(
+                "search", (self.current_api, normalize_text(query), True),
+                self._run_search, self.current_api, query, True
+            )
+        future.add_done_callback(
+            lambda future: self.root.after(0, self._on_search_done, generation, future, live)
+        )
+        self.search_futures.append(future)
+    
+    def cancel_search(self):
+        """Annule la recherche en cours et renvoie le nouveau jeton de génération"""
+        self.search_generation += 1
+        for future in self.search_futures:
+            future.cancel()
+        self.search_futures = []
+        if self.pager is not None:
+            self.pager.close()
+            self.pager = None
+        self._page_loading = False
+        self._local_hits = []
+        return self.search_generation
+    
+    def show_suggestions(self, query):
+        """Affiche tout de suite les recettes connues au titre proche, avant les résultats distants"""
+        if self.current_api not in self.suggest_providers:
+            return
+        with metrics.span("ui.suggest"):
+            self._local_hits = self.core.suggest_titles(query, self.suggest_count)
+            self.recipes = list(self._local_hits)
+            self.display_recipes_list()
+    
+    def _drop_local_hits(self, recipes):
+        """Retire de la liste les suggestions locales que recipes contient déjà"""
+        found = {(recipe.source, recipe.id) for recipe in recipes}
+        dropped = {id(hit) for hit in self._local_hits if (hit.source, hit.id) in found}
+        if dropped:
+            self._local_hits = [hit for hit in self._local_hits if id(hit) not in dropped]
+            # Modifiée sur place : la liste virtuelle partage cette séquence
+            self.recipes[:] = [recipe for recipe in self.recipes if id(recipe) not in dropped]
+    
+    def _append_results(self, recipes):
+        """Ajoute des résultats avant les suggestions locales en fin de liste"""
+        position = len(self.recipes) - len(self._local_hits)
+        self.recipes[position:position] = recipes
+        self.recipes_list.refresh()
+        self.schedule_prefetch()
     
-    def search_themealdb(self, query):
-        """Recherche sur TheMealDB API"""
+    def _run_search(self, api, query, summary=False):
+        """Exécute la recherche dans un thread de l'exécuteur
+
+        summary=True : résumés seulement pour les sources locales, détails chargés à la sélection.
+        """
+        return self.core.search(api, query, summary=summary)
+    
+    def _on_search_done(self, generation, future, live):
+        """Reçoit les résultats sur le thread Tk et ignore les réponses périmées"""
+        if generation != self.search_generation or future.cancelled():
+            return
+        self.search_futures = []
+        self._page_loading = False
+        
         try:
-            response = requests.get(
-                "https://www.themealdb.com/api/json/v1/1/search.php",
-                params={"s": query},
-                timeout=10
-            )
-            data = response.json()
-            
-            if not data.get("meals"):
+            recipes = future.result()
+        except Exception as e:
+            metrics.error(f"search.{self.current_api}", e)
+            if not live:
+                messagebox.showerror(
+                    self.texts[self.current_language]["api_error"], 
+                    f"{self.texts[self.current_language]['api_error']}: {str(e)}"
+                )
+            return
+        
+        self.core.index_recipes(recipes)
+        if not recipes and not self._local_hits:
+            if live:
+                self.recipes = []
+                self.display_recipes_list()
+            else:
                 messagebox.showinfo(
                     self.texts[self.current_language]["no_results"], 
                     self.texts[self.current_language]["no_results"]
                 )
-                return
-            
-            self.recipes = []
-            for meal in data["meals"]:
-                ingredients = []
-                for i in range(1, 21):
-                    ingredient = meal.get(f"strIngredient{i}")
-                    measure = meal.get(f"strMeasure{i}")
-                    if ingredient and ingredient.strip():
-                        ingredients.append(f"{measure} {ingredient}")
-                
-                self.recipes.append({
-                    "id": meal["idMeal"],
-                    "title": meal["strMeal"],
-                    "ingredients": "\n".join(ingredients),
-                    "instructions": meal["strInstructions"],
-                    "image_url": meal["strMealThumb"],
-                    "source": "themealdb"
-                })
-            
-            self.display_recipes_list()
-            
-        except Exception as e:
-            messagebox.showerror(
-                self.texts[self.current_language]["api_error"], 
-                f"{self.texts[self.current_language]['api_error']}: {str(e)}"
+            return
+        
+        self._drop_local_hits(recipes)
+        self.recipes = list(recipes) + self._local_hits
+        self.favorites_has_more = self.current_api == "favorites" and len(recipes) == self.core.page_size
+        self.display_recipes_list()
+        metrics.observe("ui.search_to_list", time.perf_counter() - self._search_started, provider=self.current_api)
+    
+    def on_list_scroll(self, first, last):
+        """Charge la page suivante (favoris, Edamam) à l'approche de la fin de liste"""
+        self.schedule_prefetch()
+        if self.pager is not None:
+            self._on_pager_scroll(float(first), float(last))
+        if self.favorites_has_more and float(last) >= 0.9:
+            self.favorites_has_more = False
+            generation = self.search_generation
+            future = self.executor.submit(
+                self.core.search_favorites, self.favorites_query, self.favorites_page + 1, summary=True
             )
+            future.add_done_callback(
+                lambda future: self.root.after(0, self._on_favorites_page, generation, future)
+            )
+            self.search_futures.append(future)
     
-    def search_edamam(self, query):
-        """Recherche sur Edamam API"""
-        try:
-            response = requests.get(
-                "https://api.edamam.com/api/recipes/v2",
-                params={
-                    "type": "public",
-                    "q": query,
-                    "app_id": self.api_keys["edamam"]["app_id"],
-                    "app_key": self.api_keys["edamam"]["app_key"]
-                },
-                timeout=10
+    def _on_pager_scroll(self, first, last):
+        """Allège les pages éloignées et demande la page suivante près de la fin"""
+        if self.recipes:
+            visible_page = self.pager.page_of(int(first * len(self.recipes)))
+            self.pager.evict_far(visible_page, keep=[self.current_recipe] if self.current_recipe else [])
+        
+        if last >= 0.9 and not self._page_loading and self.pager.has_more():
+            self._page_loading = True
+            generation = self.search_generation
+            future = self.executor.submit(self.pager.fetch_next)
+            future.add_done_callback(
+                lambda future: self.root.after(0, self._on_next_page, generation, future)
             )
-            data = response.json()
-            
-            if not data.get("hits") or len(data["hits"]) == 0:
-                messagebox.showinfo(
-                    self.texts[self.current_language]["no_results"], 
-                    self.texts[self.current_language]["no_results"]
+            self.search_futures.append(future)
+    
+    def _on_next_page(self, generation, future):
+        """Ajoute une page Edamam à la liste"""
+        if generation != self.search_generation or future.cancelled():
+            return
+        self._page_loading = False
+        if future.exception() is not None:
+            metrics.error("search.edamam", future.exception())
+            return
+        recipes = future.result()
+        self._drop_local_hits(recipes)
+        self._append_results(recipes)
+        self.core.index_recipes(recipes)
+    
+    def _on_favorites_page(self, generation, future):
+        """Ajoute une page de favoris à la liste"""
+        if generation != self.search_generation or future.cancelled():
+            return
+        if future.exception() is not None:
+            metrics.error("search.favorites", future.exception())
+            return
+        recipes = future.result()
+        self.favorites_page += 1
+        self.favorites_has_more = len(recipes) == self.core.page_size
+        self._drop_local_hits(recipes)
+        self._append_results(recipes)
+    
+    def _start_federated_search(self, generation, query, live):
+        """Interroge tous les fournisseurs en parallèle"""
+        self.recipes = list(self._local_hits)
+        self.display_recipes_list()
+        self._seen_recipes = set()
+        self._pending_providers = set(self.core.federated_providers)
+        self._provider_errors = []
+        
+        for provider in self.core.federated_providers:
+            future = self.flights.submit(
+                "search", (provider, normalize_text(query), False), self._run_search, provider, query
+            )
+            future.add_done_callback(
+                lambda future, provider=provider: self.root.after(
+                    0, self._on_provider_done, generation, provider, future, live
                 )
-                return
-            
-            self.recipes = []
-            for hit in data["hits"]:
-                recipe = hit["recipe"]
-                
-                # Formater les ingrédients
-                ingredients = []
-                for ingredient in recipe.get("ingredients", []):
-                    ingredients.append(f"{ingredient.get('quantity', '')} {ingredient.get('measure', '').lower()} {ingredient['food']}")
-                
-                self.recipes.append({
-                    "id": recipe["uri"].split("#")[1],
-                    "title": recipe["label"],
-                    "ingredients": "\n".join(ingredients),
-                    "instructions": "\n".join(recipe.get("instructionLines", ["No instructions available"])),
-                    "image_url": recipe["image"],
-                    "source": "edamam"
-                })
-            
-            self.display_recipes_list()
-            
-        except Exception as e:
+            )
+            self.search_futures.append(future)
+            self.root.after(self.provider_deadline, self._on_provider_deadline, generation, provider, future, live)
+    
+    def _on_provider_done(self, generation, provider, future, live):
+        """Ajoute les résultats d'un fournisseur dès qu'il répond"""
+        if generation != self.search_generation or provider not in self._pending_providers:
+            return
+        self._pending_providers.discard(provider)
+        
+        if future.cancelled():
+            pass
+        elif future.exception() is not None:
+            metrics.error(f"search.{provider}", future.exception())
+            self._provider_errors.append(f"{self.texts[self.current_language][provider]}: {future.exception()}")
+        else:
+            new_recipes = []
+            for recipe in future.result():
+                key = recipe_key(recipe)
+                if key not in self._seen_recipes:
+                    self._seen_recipes.add(key)
+                    new_recipes.append(recipe)
+            # Une suggestion locale retrouvée par un fournisseur prend sa place dans les résultats
+            self._drop_local_hits(new_recipes)
+            self._append_results(new_recipes)
+            self.core.index_recipes(new_recipes)
+        
+        self._finish_federated_search(live)
+    
+    def _on_provider_deadline(self, generation, provider, future, live):
+        """Abandonne un fournisseur trop lent pour ne pas bloquer la vue fusionnée"""
+        if generation != self.search_generation or provider not in self._pending_providers:
+            return
+        self._pending_providers.discard(provider)
+        metrics.count("search.deadline_exceeded", provider=provider)
+        future.cancel()
+        self._finish_federated_search(live)
+    
+    def _finish_federated_search(self, live):
+        """Signale l'absence de résultats une fois tous les fournisseurs terminés"""
+        if self._pending_providers or self.recipes or live:
+            return
+        self.search_futures = []
+        
+        if self._provider_errors:
             messagebox.showerror(
                 self.texts[self.current_language]["api_error"], 
-                f"{self.texts[self.current_language]['api_error']}: {str(e)}"
+                "\n".join(self._provider_errors)
+            )
+        else:
+            messagebox.showinfo(
+                self.texts[self.current_language]["no_results"], 
+                self.texts[self.current_language]["no_results"]
             )
     
+    def recipe_label(self, recipe):
+        """Libellé affiché dans la liste des résultats"""
+        if recipe.pantry_match is not None:
+            return f"{recipe.title} ({recipe.pantry_match[0]}/{recipe.pantry_match[1]})"
+        if self.current_api == "all":
+            return f"{recipe.title} ({self.texts[self.current_language][recipe.source]})"
+        return recipe.title
+    
+    def on_search_key(self, event):
+        """Recherche instantanée avec anti-rebond pendant la saisie"""
+        if event.keysym == "Return":
+            self.search_recipes()
+            return
+        text = self.search_entry.get()
+        if text == self._last_search_text:
+            return  # curseur, Maj, Ctrl... : la saisie n'a pas changé
+        self._last_search_text = text
+        query = text.strip()
+        suggest = len(query) >= 2 and self.current_api in self.suggest_providers
+        if not self.live_search_var.get() and not suggest:
+            return
+        
+        self.user_activity()
+        self.cancel_search()
+        if suggest:
+            self.show_suggestions(query)
+        if not self.live_search_var.get():
+            return
+        if self._live_search_job is not None:
+            self.root.after_cancel(self._live_search_job)
+        self._live_search_job = self.root.after(self.live_search_delay, self._run_live_search)
+    
+    def _run_live_search(self):
+        """Lance la recherche instantanée une fois la saisie stabilisée"""
+        self._live_search_job = None
+        if len(self.search_entry.get().strip()) >= 2:
+            self.search_recipes(live=True)
+    
+    def sync_catalog(self):
+        """Synchronise le catalogue TheMealDB en arrière-plan"""
+        self.sync_btn.config(state=tk.DISABLED)
+        future = self.executor.submit(
+            self.core.sync_catalog,
+            progress=lambda done, total: self.root.after(0, self._on_sync_progress, done, total)
+        )
+        future.add_done_callback(lambda future: self.root.after(0, self._on_sync_done, future))
+    
+    def _on_sync_progress(self, done, total):
+        """Affiche l'avancement de la synchronisation"""
+        self.sync_btn.config(text=f"{self.texts[self.current_language]['sync']} {done}/{total}")
+    
+    def _on_sync_done(self, future):
+        """Fin de la synchronisation du catalogue"""
+        self.sync_btn.config(state=tk.NORMAL, text=self.texts[self.current_language]["sync"])
+        if future.exception() is not None:
+            metrics.error("sync", future.exception())
+            messagebox.showerror(
+                self.texts[self.current_language]["sync_error"], 
+                f"{self.texts[self.current_language]['sync_error']}: {future.exception()}"
+            )
+            return
+        
+        messagebox.showinfo(
+            self.texts[self.current_language]["sync_done"], 
+            self.texts[self.current_language]["sync_done"]
+        )
+    
     def display_recipes_list(self):
         """Affiche la liste des recettes"""
-        self.recipes_list.delete(0, tk.END)
-        for recipe in self.recipes:
-            self.recipes_list.insert(tk.END, recipe["title"])
+        with metrics.span("ui.list"):
+            self.recipes_list.set_items(self.recipes)
+        self.schedule_prefetch()
+    
+    def schedule_prefetch(self):
+        """Précharge les recettes listées les plus proches de la sélection (ou du haut de la fenêtre)"""
+        count = len(self.recipes)
+        anchor = self.recipes_list.selected_index()
+        top, visible = self.recipes_list.top, self.recipes_list.visible
+        if anchor is None or not top <= anchor < top + visible:
+            anchor = top
+        
+        # De l'ancre vers l'extérieur : anchor, anchor + 1, anchor - 1, anchor + 2...
+        indices = []
+        for distance in range(count):
+            for index in (anchor + distance, anchor - distance) if distance else (anchor,):
+                if 0 <= index < count:
+                    indices.append(index)
+            if len(indices) >= self.prefetch_count:
+                break
+        
+        fetch = self.core.image_fetcher()
+        jobs = []
+        for priority, index in enumerate(indices[:self.prefetch_count]):
+            recipe = self.recipes[index]
+            url = recipe.image_url
+            if url and not self.image_cache.in_memory(url):
+                jobs.append((priority, ("image", url), "images", lambda url=url: self.flights.submit(
+                    "image", url, self.image_cache.load, url, fetch, executor=self.image_pool
+                )))
+            if self.prefetch_translations and not recipe.partial:
+                key = (recipe.source, recipe.id, "fr")
+                jobs.append((priority + self.prefetch_count, ("translation",) + key, "translate",
+                             lambda key=key, recipe=recipe: self.flights.submit(
+                                 "translation", key, self.core.translate_recipe, recipe, "fr"
+                             )))
+        self.prefetcher.schedule(jobs)
+    
+    def user_activity(self):
+        """Suspend les préchargements pendant le travail demandé par l'utilisateur"""
+        self.prefetcher.pause()
+        if self._prefetch_job is not None:
+            self.root.after_cancel(self._prefetch_job)
+        self._prefetch_job = self.root.after(self.prefetch_delay, self._resume_prefetch)
+    
+    def _resume_prefetch(self):
+        """Reprend les préchargements une fois le travail de l'utilisateur terminé"""
+        pending = self.search_futures + [self._image_future, self._translation_future]
+        if any(future is not None and not future.done() for future in pending):
+            self._prefetch_job = self.root.after(self.prefetch_delay, self._resume_prefetch)
+            return
+        self._prefetch_job = None
+        self.prefetcher.resume()
     
-    def show_recipe_details(self, event):
+    def show_recipe_details(self, index=None):
         """Affiche les détails de la recette sélectionnée"""
-        selection = self.recipes_list.curselection()
-        if not selection:
+        index = self.recipes_list.selected_index()
+        if index is None:
             return
         
-        recipe = self.recipes[selection[0]]
+        self.open_recipe(self.recipes[index])
+    
+    def open_recipe(self, recipe):
+        """Affiche une recette, après avoir chargé ses détails si elle est partielle"""
+        self.user_activity()
+        self.create_details_pane()
+        self._requested_recipe = recipe
+        if recipe.partial:
+            # Résumé ou page éloignée : détails chargés par id (favoris, catalogue, cache HTTP, réseau)
+            future = self.executor.submit(self.core.load_details, recipe)
+            future.add_done_callback(lambda future: self.root.after(0, self._on_details_loaded, recipe, future))
+            return
+        self.display_recipe(recipe)
+    
+    def _on_details_loaded(self, recipe, future):
+        """Affiche une recette dont les détails viennent d'être rechargés"""
+        if future.exception() is not None:
+            metrics.error("details", future.exception())
+            messagebox.showerror(
+                self.texts[self.current_language]["api_error"], 
+                f"{self.texts[self.current_language]['api_error']}: {str(future.exception())}"
+            )
+            return
+        if recipe is self._requested_recipe:
+            self.display_recipe(recipe)
+    
+    def display_recipe(self, recipe):
+        """Affiche titre, image, ingrédients et instructions d'une recette"""
         self.current_recipe = recipe
         self.current_language = "en"  # Reset to English when new recipe selected
+        if self._translation_future is not None:
+            self._translation_future.cancel()
+            self._translation_future = None
         
-        self.recipe_title.config(text=recipe["title"])
-        self.load_image_async(recipe["image_url"])
+        self.recipe_title.config(text=recipe.title)
+        self.load_image_async(recipe.image_url)
         
         self.update_text_widgets(recipe)
+        self.load_similar_async(recipe)
+    
+    def load_similar_async(self, recipe):
+        """Cherche les recettes proches dans l'index local, hors du thread Tk"""
+        self.similar_recipes = []
+        self.similar_list.delete(0, tk.END)
+        future = self.executor.submit(self.core.similar_recipes, recipe, self.similar_count)
+        future.add_done_callback(lambda future: self.root.after(0, self._on_similar_loaded, recipe, future))
+    
+    def _on_similar_loaded(self, recipe, future):
+        """Affiche les recettes proches si la recette est toujours affichée"""
+        if future.exception() is not None:
+            metrics.error("similar", future.exception())
+            return
+        if recipe is not self.current_recipe:
+            return
+        self.similar_recipes = [similar for similar, _ in future.result()]
+        self.similar_list.insert(tk.END, *(f"{similar.title} ({score:.0%})" for similar, score in future.result()))
+    
+    def show_similar_recipe(self, event):
+        """Ouvre la recette proche sélectionnée"""
+        selection = self.similar_list.curselection()
+        if selection:
+            self.open_recipe(self.similar_recipes[selection[0]])
     
     def load_image_async(self, url):
-        """Charge l'image en arrière-plan"""
-        def fetch_image():
-            try:
-                response = requests.get(url, stream=True, timeout=10)
-                img = Image.open(BytesIO(response.content))
-                img.thumbnail((350, 350))
-                photo = ImageTk.PhotoImage(img)
-                self.root.after(0, lambda: self.display_image(photo))
-            except Exception as e:
-                print(f"Image error: {e}")
-        
-        Thread(target=fetch_image, daemon=True).start()
+        """Charge l'image en arrière-plan (téléchargement, décodage, miniature)"""
+        if self._image_future is not None:
+            self._image_future.cancel()
+            self._image_future = None
+        
+        img = self.image_cache.get_memory(url)
+        self.prefetcher.used(("image", url), img is not None)
+        if img is not None:
+            self.display_image(self.make_photo(img))
+            return
+        
+        future = self.flights.submit(
+            "image", url, self.image_cache.load, url, self.core.image_fetcher(), executor=self.image_pool
+        )
+        future.add_done_callback(lambda future: self.root.after(0, self._on_image_loaded, url, future))
+        self._image_future = future
+    
+    def _on_image_loaded(self, url, future):
+        """Affiche l'image chargée si la recette est toujours sélectionnée"""
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            metrics.error("image", future.exception())
+            return
+        if self.current_recipe is None or self.current_recipe.image_url != url:
+            return
+        self._image_future = None
+        self.display_image(self.make_photo(future.result()))
+    
+    def make_photo(self, img):
+        """Crée la PhotoImage ; Tk n'est pas thread-safe, donc uniquement sur le thread Tk"""
+        from PIL import ImageTk
+        
+        with metrics.span("image.photo"):
+            return ImageTk.PhotoImage(img)
     
     def display_image(self, photo):
         """Affiche l'image chargée"""
@@ -553,8 +1128,8 @@ class ChefAI:
     def update_text_widgets(self, recipe):
         """Met à jour les zones de texte"""
         for widget, content in [
-            (self.ingredients_text, recipe["ingredients"]),
-            (self.instructions_text, recipe["instructions"])
+            (self.ingredients_text, recipe.ingredients_text),
+            (self.instructions_text, recipe.instructions)
         ]:
             widget.config(state=tk.NORMAL)
             widget.delete(1.0, tk.END)
@@ -568,42 +1143,45 @@ class ChefAI:
         
         recipe = self.current_recipe
         target_lang = "fr" if self.current_language == "en" else "en"
+        if self._translation_future is not None and not self._translation_future.done():
+            return  # traduction déjà en cours
+        self.user_activity()
+        if self.prefetch_translations:
+            self.prefetcher.used(("translation", recipe.source, recipe.id, target_lang), True)
         
-        try:
-            Thread(target=self._translate_recipe_background, args=(recipe, target_lang), daemon=True).start()
-        except Exception as e:
-            messagebox.showerror(
-                self.texts[self.current_language]["trans_error"], 
-                f"{self.texts[self.current_language]['trans_error']}: {str(e)}"
-            )
+        self.recipe_title.config(text="Translating..." if target_lang == "fr" else "Traduction en cours...")
+        future = self.flights.submit(
+            "translation", (recipe.source, recipe.id, target_lang), self.core.translate_recipe, recipe, target_lang
+        )
+        future.add_done_callback(lambda future: self.root.after(0, self._on_translated, recipe, target_lang, future))
+        self._translation_future = future
     
-    def _translate_recipe_background(self, recipe, target_lang):
-        """Traduction en arrière-plan"""
-        self.root.after(0, lambda: self.recipe_title.config(
-            text="Translating..." if target_lang == "fr" else "Traduction en cours..."
-        ))
-        
-        translated_title = self._translate_with_cache(recipe["title"], target_lang)
-        ingredients = recipe["ingredients"].split("\n")
-        translated_ingredients = [self._translate_with_cache(ing, target_lang) for ing in ingredients]
-        translated_instructions = self._translate_with_cache(recipe["instructions"], target_lang)
-        
-        self.root.after(0, lambda: self._update_translated_ui(
-            translated_title,
-            "\n".join(translated_ingredients),
-            translated_instructions,
+    def _on_translated(self, recipe, target_lang, future):
+        """Affiche la traduction si la recette est toujours affichée"""
+        if future.cancelled() or recipe is not self.current_recipe:
+            return
+        self._translation_future = None
+        if future.exception() is not None:
+            metrics.error("translation", future.exception())
+            self._on_translation_error(recipe, future.exception())
+            return
+        
+        translated = future.result()
+        self._update_translated_ui(
+            translated["title"],
+            translated["ingredients"],
+            translated["instructions"],
             target_lang
-        ))
+        )
     
-    def _translate_with_cache(self, text, target_lang):
-        """Traduction avec cache"""
-        cache_key = f"{text}_{target_lang}"
-        if cache_key in self.translation_cache:
-            return self.translation_cache[cache_key]
-        
-        translated = self.translator.translate(text, src='en' if target_lang == 'fr' else 'fr', dest=target_lang).text
-        self.translation_cache[cache_key] = translated
-        return translated
+    def _on_translation_error(self, recipe, error):
+        """Rétablit le titre et signale l'échec de la traduction"""
+        if recipe is self.current_recipe:
+            self.recipe_title.config(text=recipe.title)
+        messagebox.showerror(
+            self.texts[self.current_language]["trans_error"], 
+            f"{self.texts[self.current_language]['trans_error']}: {str(error)}"
+        )
     
     def _update_translated_ui(self, title, ingredients, instructions, target_lang):
         """Met à jour l'interface avec la traduction"""
@@ -621,37 +1199,185 @@ class ChefAI:
             widget.config(state=tk.DISABLED)
     
     def save_to_favorites(self):
-        """Sauvegarde la recette en favoris"""
+        """Sauvegarde la recette en favoris (écriture SQLite hors du thread Tk)"""
         if not self.current_recipe:
             return
         
-        try:
-            conn = sqlite3.connect(self.favorites_db)
-            c = conn.cursor()
-            
-            c.execute('''INSERT OR IGNORE INTO favorites 
-                        VALUES (?, ?, ?, ?, ?, ?)''',
-                     (self.current_recipe["id"],
-                      self.current_recipe["title"],
-                      self.current_recipe["ingredients"],
-                      self.current_recipe["instructions"],
-                      self.current_recipe["image_url"],
-                      self.current_recipe["source"]))
-            
-            conn.commit()
-            messagebox.showinfo(
-                self.texts[self.current_language]["save_success"], 
-                self.texts[self.current_language]["save_success"]
-            )
-        except Exception as e:
+        future = self.executor.submit(self.core.save_favorite, self.current_recipe)
+        future.add_done_callback(lambda future: self.root.after(0, self._on_favorite_saved, future))
+    
+    def _on_favorite_saved(self, future):
+        """Confirme l'enregistrement en favoris"""
+        if future.exception() is not None:
+            metrics.error("favorites", future.exception())
             messagebox.showerror(
                 "Error", 
-                f"{self.texts[self.current_language]['save_success']}: {str(e)}"
+                f"{self.texts[self.current_language]['save_success']}: {str(future.exception())}"
             )
-        finally:
-            conn.close()
+            return
+        messagebox.showinfo(
+            self.texts[self.current_language]["save_success"], 
+            self.texts[self.current_language]["save_success"]
+        )
+    
+    def show_shopping_list(self):
+        """Liste de courses des favoris affichés (de tous les favoris hors de la source Favoris)"""
+        recipe_ids = [recipe.id for recipe in self.recipes] if self.current_api == "favorites" and self.recipes else None
+        future = self.executor.submit(self.core.shopping_list, recipe_ids)
+        future.add_done_callback(lambda future: self.root.after(0, self._on_shopping_list, future))
+    
+    def _on_shopping_list(self, future):
+        """Affiche la liste de courses dans une fenêtre"""
+        if future.exception() is not None:
+            metrics.error("shopping_list", future.exception())
+            return
+        colors = self.themes["dark" if self.dark_mode else "light"]
+        window = tk.Toplevel(self.root)
+        window.title(self.texts[self.current_language]["shopping"])
+        window.configure(bg=colors["bg"])
+        text = tk.Text(
+            window, 
+            width=50, 
+            height=30, 
+            wrap=tk.WORD, 
+            font=('Helvetica', 11), 
+            bg=colors["widget_bg"], 
+            fg=colors["text"]
+        )
+        text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        text.insert(tk.END, "\n".join(f"• {item.line()}" for item in future.result()))
+        text.config(state=tk.DISABLED)
+    
+    def toggle_stats_panel(self):
+        """Affiche ou masque le panneau des mesures de performance"""
+        if self.stats_window is not None:
+            self.close_stats_panel()
+            return
+        
+        colors = self.themes["dark" if self.dark_mode else "light"]
+        self.stats_window = tk.Toplevel(self.root)
+        self.stats_window.title(self.texts[self.current_language]["stats"])
+        self.stats_window.configure(bg=colors["bg"])
+        self.stats_window.protocol("WM_DELETE_WINDOW", self.close_stats_panel)
+        
+        buttons_frame = ttk.Frame(self.stats_window, padding=5)
+        buttons_frame.pack(fill=tk.X)
+        ttk.Button(
+            buttons_frame, 
+            text="JSON", 
+            command=lambda: self.export_metrics("json"), 
+            style='Secondary.TButton'
+        ).pack(side=tk.LEFT, padx=5)
+        ttk.Button(
+            buttons_frame, 
+            text="Prometheus", 
+            command=lambda: self.export_metrics("prometheus"), 
+            style='Secondary.TButton'
+        ).pack(side=tk.LEFT, padx=5)
+        self.stats_reset_btn = ttk.Button(
+            buttons_frame, 
+            text=self.texts[self.current_language]["reset"], 
+            command=metrics.reset, 
+            style='Secondary.TButton'
+        )
+        self.stats_reset_btn.pack(side=tk.RIGHT, padx=5)
+        
+        self.stats_text = tk.Text(
+            self.stats_window, 
+            width=90, 
+            height=30, 
+            wrap=tk.NONE, 
+            font=('Courier', 10), 
+            bg=colors["widget_bg"], 
+            fg=colors["text"]
+        )
+        self.stats_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.theme_widget(self.stats_window, group="stats", bg="bg")
+        self.theme_widget(self.stats_text, group="stats", bg="widget_bg", fg="text")
+        self.localize(self.stats_window.title, "stats", group="stats")
+        self.localize(lambda text: self.stats_reset_btn.config(text=text), "reset", group="stats")
+        self.refresh_stats_panel()
+    
+    def refresh_stats_panel(self):
+        """Rafraîchit le panneau des mesures tant qu'il est ouvert"""
+        self._stats_job = None
+        if self.stats_window is None:
+            return
+        self.stats_text.config(state=tk.NORMAL)
+        self.stats_text.delete(1.0, tk.END)
+        self.stats_text.insert(tk.END, metrics.to_text())
+        prefetch = " ".join(f"{name}={value}" for name, value in self.prefetcher.stats().items())
+        self.stats_text.insert(tk.END, f"\n\nprefetch {prefetch}")
+        self.stats_text.config(state=tk.DISABLED)
+        self._stats_job = self.root.after(self.stats_refresh, self.refresh_stats_panel)
+    
+    def close_stats_panel(self):
+        """Ferme le panneau des mesures"""
+        if self._stats_job is not None:
+            self.root.after_cancel(self._stats_job)
+            self._stats_job = None
+        if self.stats_window is not None:
+            self.forget_group("stats")
+            self.stats_window.destroy()
+            self.stats_window = None
+    
+    def export_metrics(self, fmt):
+        """Exporte les mesures en JSON ou au format texte de Prometheus"""
+        from tkinter import filedialog
+        
+        extension = ".prom" if fmt == "prometheus" else ".json"
+        path = filedialog.asksaveasfilename(
+            parent=self.stats_window,
+            defaultextension=extension,
+            filetypes=[(fmt, f"*{extension}")]
+        )
+        if not path:
+            return
+        try:
+            metrics.export(path, fmt)
+        except OSError as e:
+            messagebox.showerror(
+                self.texts[self.current_language]["export_error"], 
+                f"{self.texts[self.current_language]['export_error']}: {str(e)}"
+            )
+    
+    def close(self):
+        """Libère les ressources et ferme la fenêtre"""
+        self.cancel_search()
+        self.close_stats_panel()
+        self.prefetcher.pause()
+        self.prefetcher.clear()
+        if self._prefetch_job is not None:
+            self.root.after_cancel(self._prefetch_job)
+        if self._translation_future is not None:
+            self._translation_future.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.image_pool.shutdown(wait=False, cancel_futures=True)
+        self.core.close()
+        self.root.destroy()
+
+def write_startup_report(path, exit_after):
+    """Hook de démarrage : écrit les temps mesurés (JSON) et quitte si demandé"""
+    def on_startup(app):
+        with open(path, "w", encoding="utf-8") as report:
+            json.dump(dict(app.startup_times, fast_start=app.fast_start), report)
+        if exit_after:
+            app.root.after_idle(app.close)
+    return on_startup
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ChefAI - Intelligent Culinary Assistant")
+    parser.add_argument("--fast-start", action="store_true",
+                        default=os.environ.get("CHEFAI_FAST_START") == "1",
+                        help="charge le panneau de détails, les bases et le traducteur à la demande")
+    parser.add_argument("--startup-report", help="écrit les temps de démarrage (JSON) dans ce fichier")
+    parser.add_argument("--exit-after-startup", action="store_true",
+                        help="quitte après le premier affichage (mesure en CI)")
+    args = parser.parse_args()
+    
     root = tk.Tk()
-    app = ChefAI(root)
-    root.mainloop()
\ No newline at end of file
+    on_startup = write_startup_report(args.startup_report, args.exit_after_startup) if args.startup_report else None
+    app = ChefAI(root, fast_start=args.fast_start, on_startup=on_startup)
+    root.protocol("WM_DELETE_WINDOW", app.close)
+    root.mainloop()
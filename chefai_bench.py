@@ -0,0 +1,673 @@
+"""Banc de mesure hors ligne de ChefAI
+
+Des serveurs locaux remplacent TheMealDB (search.php), Edamam (recipes/v2),
+le CDN d'images et le service de traduction, avec latence et taille de
+réponse réglables. Les résultats sont écrits en JSON pour être comparés
+d'un commit à l'autre.
+
+Exemples :
+    python chefai_bench.py -o bench.json
+    python chefai_bench.py search images --latency 50 --meals 100
+    python chefai_bench.py --compare bench.json --fail-above 20
+"""
+import argparse
+import json
+import multiprocessing
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO, StringIO
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from chefai_core import ChefCore, parse_edamam, parse_themealdb
+from image_cache import THUMBNAIL_SIZE, ImageCache, decode_thumbnail
+from metrics import metrics
+from network import HttpClient
+from prefetch import PrefetchScheduler
+from recipe import Recipe, ingredient, split_measure
+from shopping_list import normalize_ingredient, parse_quantity, parse_unit
+from similar_index import SimilarIndex
+from single_flight import SingleFlight
+from title_index import TitleIndex
+
+MEASURES = ["1 1/2 cups", "400g", "2 tbs", "1 tsp", "½ cup", "3 large", "1kg", "250 ml", "2 cloves",
+            "1 lb", "to taste", "pinch", "1,5 l", "4 oz chopped"]
+
+LOREM = ("Preheat the oven. Chop the onions and garlic, then fry them gently in olive oil "
+         "until golden. Add the remaining ingredients and simmer for twenty minutes. ")
+
+
+def make_meal(key, number, instructions_size=600):
+    """Recette au format TheMealDB"""
+    meal = {
+        "idMeal": f"{key}-{number}",
+        "strMeal": f"Stub meal {key} {number}",
+        "strInstructions": (LOREM * (instructions_size // len(LOREM) + 1))[:instructions_size],
+        "strMealThumb": f"/images/{key}-{number}.jpg",
+    }
+    for i in range(1, 21):
+        meal[f"strIngredient{i}"] = f"ingredient {i}" if i <= 12 else ""
+        meal[f"strMeasure{i}"] = f"{i} g" if i <= 12 else ""
+    return meal
+
+
+def make_hit(key, number, instructions_size=600):
+    """Résultat au format Edamam recipes/v2"""
+    lines = (LOREM * (instructions_size // len(LOREM) + 1))[:instructions_size].split(". ")
+    return {"recipe": {
+        "uri": f"http://www.edamam.com/ontologies/edamam.owl#recipe_{key}{number}",
+        "label": f"Stub recipe {key} {number}",
+        "image": f"/images/{key}-{number}.jpg",
+        "ingredients": [{"quantity": i, "measure": "Gram", "food": f"food {i}"} for i in range(1, 13)],
+        "instructionLines": lines,
+    }}
+
+
+def make_jpeg(size):
+    """Image JPEG de test aux dimensions demandées"""
+    from PIL import Image
+
+    img = Image.linear_gradient("L").resize(size).convert("RGB")
+    buffer = BytesIO()
+    img.save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Répond comme les services externes, après la latence configurée"""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # En-têtes et corps partent en deux écritures : sans TCP_NODELAY,
+        # l'accusé de réception retardé ajoute ~40 ms à chaque réponse
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def do_GET(self):
+        config = self.server.config
+        url = urlparse(self.path)
+        params = {name: values[0] for name, values in parse_qs(url.query).items()}
+        time.sleep(config.latency)
+
+        if url.path == "/themealdb/search.php":
+            key = params.get("s") or params.get("f", "")
+            body = {"meals": [make_meal(key, n, config.instructions_size) for n in range(config.meals)]}
+            self.send_json(body)
+        elif url.path == "/themealdb/lookup.php":
+            meal_id = params.get("i", "")
+            self.send_json({"meals": [make_meal(meal_id, 0, config.instructions_size)]})
+        elif url.path == "/edamam/recipes/v2":
+            page = int(params.get("_cont", 0))
+            key = f"{params.get('q', '')}p{page}"
+            body = {"hits": [make_hit(key, n, config.instructions_size) for n in range(config.meals)]}
+            if page + 1 < config.pages:
+                next_params = dict(params, _cont=page + 1)
+                body["_links"] = {"next": {"href": self.server_url(f"{url.path}?{urlencode(next_params)}")}}
+            self.send_json(body)
+        elif url.path.startswith("/edamam/recipes/v2/"):
+            self.send_json(make_hit(url.path.rsplit("/", 1)[-1], 0, config.instructions_size))
+        elif url.path.startswith("/images/"):
+            self.send_body(config.image, "image/jpeg")
+        elif url.path == "/translate":
+            dest = params.get("tl", "")
+            lines = params.get("q", "").split("\n")
+            self.send_json({"text": "\n".join(f"[{dest}] {line}" for line in lines)})
+        else:
+            self.send_error(404)
+
+    def server_url(self, path):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}{path}"
+
+    def send_json(self, body):
+        self.send_body(json.dumps(body).encode("utf-8"), "application/json")
+
+    def send_body(self, body, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServers:
+    """Serveur local remplaçant TheMealDB, Edamam, le CDN d'images et la traduction"""
+
+    def __init__(self, latency=0.02, meals=25, instructions_size=600, image_size=(1280, 960), pages=5):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.server.daemon_threads = True
+        self.server.config = SimpleNamespace(
+            latency=latency,
+            meals=meals,
+            instructions_size=instructions_size,
+            image=make_jpeg(image_size),
+            pages=pages,
+        )
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def url(self, path):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}{path}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class StubTranslator:
+    """Client du service de traduction local, avec l'interface de googletrans"""
+
+    def __init__(self, http, url):
+        self.http = http
+        self.url = url
+
+    def translate(self, text, src="en", dest="fr"):
+        response = self.http.get(self.url, provider="translate",
+                                 params={"sl": src, "tl": dest, "q": text}, timeout=10)
+        response.raise_for_status()
+        return SimpleNamespace(text=response.json()["text"])
+
+
+def summarize(samples, unit, better="lower"):
+    """Statistiques d'une série de mesures"""
+    ordered = sorted(samples)
+    return {
+        "unit": unit,
+        "better": better,
+        "n": len(ordered),
+        "median": statistics.median(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "min": ordered[0],
+        "max": ordered[-1],
+        "mean": statistics.fmean(ordered),
+    }
+
+
+def timed(function, *args):
+    """Durée d'un appel en millisecondes"""
+    start = time.perf_counter()
+    function(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+def bench_search(core, stubs, args):
+    """Latence recherche -> liste (téléchargement, cache, analyse, libellés)"""
+    def search_to_list(provider, query):
+        return [recipe.title for recipe in core.search(provider, query)]
+
+    results = {}
+    for provider in ("themealdb", "edamam"):
+        cold = [timed(search_to_list, provider, f"cold{n}") for n in range(args.repeat)]
+        search_to_list(provider, "warm")
+        warm = [timed(search_to_list, provider, "warm") for _ in range(args.repeat)]
+        results[f"search_to_list.{provider}.cold"] = summarize(cold, "ms")
+        results[f"search_to_list.{provider}.warm"] = summarize(warm, "ms")
+    return results
+
+
+def bench_parse(core, stubs, args):
+    """Débit d'analyse des réponses JSON en recettes et mémoire par recette"""
+    payloads = {
+        "themealdb": (json.dumps({"meals": [make_meal("p", n) for n in range(args.parse_size)]}), parse_themealdb),
+        "edamam": (json.dumps({"hits": [make_hit("p", n) for n in range(args.parse_size)]}), parse_edamam),
+    }
+    results = {}
+    for provider, (payload, parser) in payloads.items():
+        rates = []
+        for _ in range(args.repeat):
+            elapsed = timed(lambda: parser(json.loads(payload))) / 1000
+            rates.append(args.parse_size / elapsed)
+        results[f"parse.{provider}"] = summarize(rates, "recipes/s", better="higher")
+
+        # Mémoire retenue par les recettes une fois la réponse JSON libérée
+        tracemalloc.start()
+        data = json.loads(payload)
+        recipes = parser(data)
+        del data
+        retained = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del recipes
+        results[f"recipe_memory.{provider}"] = summarize([retained / args.parse_size], "bytes/recipe")
+    return results
+
+
+def bench_images(core, stubs, args):
+    """Chargement d'image : téléchargement, décodage et miniature, puis disque et mémoire"""
+    fetch = core.image_fetcher()
+    cache_dir = core.path("bench-thumbnails")
+    cache = ImageCache(cache_dir)
+    urls = [stubs.url(f"/images/bench-{n}.jpg") for n in range(args.repeat)]
+
+    cold = [timed(cache.load, url, fetch) for url in urls]
+    memory = [timed(cache.load, url, fetch) for url in urls]
+    disk_cache = ImageCache(cache_dir)
+    disk = [timed(disk_cache.load, url, fetch) for url in urls]
+    return {
+        "image_load.cold": summarize(cold, "ms"),
+        "image_load.disk": summarize(disk, "ms"),
+        "image_load.memory": summarize(memory, "ms"),
+    }
+
+
+def bench_prefetch(core, stubs, args):
+    """Délai sélection -> image quand l'utilisateur parcourt la liste, avec et sans préchargement"""
+    fetch = core.image_fetcher()
+    think = 0.15  # s entre deux sélections
+
+    def browse(prefetch, run):
+        cache = ImageCache(core.path(f"bench-prefetch-{prefetch}-{run}"))
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            flights = SingleFlight(pool)
+            urls = [stubs.url(f"/images/prefetch-{prefetch}-{run}-{n}.jpg") for n in range(8)]
+            scheduler = PrefetchScheduler(max_running=1)
+            if prefetch:
+                scheduler.schedule((priority, ("image", url), "images",
+                                    lambda url=url: flights.submit("image", url, cache.load, url, fetch))
+                                   for priority, url in enumerate(urls))
+            delays = []
+            for url in urls:
+                time.sleep(think)
+                scheduler.pause()
+                scheduler.used(("image", url), cache.in_memory(url))
+                delays.append(timed(lambda: cache.get_memory(url) or flights.submit(
+                    "image", url, cache.load, url, fetch).result()))
+                scheduler.resume()
+        return delays
+
+    results = {}
+    for prefetch in (False, True):
+        delays = [delay for run in range(max(1, args.repeat // 8)) for delay in browse(prefetch, run)]
+        results[f"select_to_image.{'prefetch' if prefetch else 'on_demand'}"] = summarize(delays, "ms")
+    return results
+
+
+def decode_full(data, size=THUMBNAIL_SIZE):
+    """Référence : décodage pleine résolution puis réduction"""
+    from PIL import Image
+
+    img = Image.open(BytesIO(data))
+    img.load()
+    img.thumbnail(size)
+    return img
+
+
+def decode_draft(data, size=THUMBNAIL_SIZE):
+    """Chemin de l'application : décodage JPEG à résolution réduite"""
+    return decode_thumbnail(BytesIO(data), size)
+
+
+DECODERS = {"full": decode_full, "draft": decode_draft}
+
+
+def peak_rss():
+    """Pic de mémoire résidente du processus, en Kio
+
+    VmHWM plutôt que ru_maxrss sous Linux : ru_maxrss survit à exec() et
+    reprendrait le pic du processus parent.
+    """
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 if sys.platform == "darwin" else peak
+
+
+def decode_peak_memory(variant, data, results):
+    """Hausse du pic de mémoire (Kio) pendant un décodage ; lancé dans un processus neuf"""
+    DECODERS[variant](make_jpeg((64, 64)))  # imports et allocations initiales hors mesure
+    before = peak_rss()
+    DECODERS[variant](data)
+    results.put(peak_rss() - before)
+
+
+def bench_decode(core, stubs, args):
+    """Temps et pic de mémoire du décodage d'une image : pleine résolution contre mode draft"""
+    data = stubs.server.config.image
+    results = {}
+    for variant, decode in DECODERS.items():
+        results[f"image_decode.{variant}"] = summarize([timed(decode, data) for _ in range(args.repeat)], "ms")
+
+    if sys.platform == "win32":
+        return results
+    context = multiprocessing.get_context("spawn")
+    for variant in DECODERS:
+        samples = []
+        for _ in range(min(args.repeat, 3)):
+            queue = context.Queue()
+            process = context.Process(target=decode_peak_memory, args=(variant, data, queue))
+            process.start()
+            samples.append(queue.get())
+            process.join()
+        results[f"image_decode.{variant}.peak_memory"] = summarize(samples, "KiB")
+    return results
+
+
+def bench_paging(core, stubs, args):
+    """Attente de la page Edamam suivante, avec et sans préchargement"""
+    results = {}
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        for mode, pool in (("prefetch", executor), ("sequential", None)):
+            waits = []
+            for run in range(max(1, args.repeat // args.pages)):
+                pager = core.edamam_pager(f"{mode}{run}", executor=pool, max_pages=args.pages)
+                pager.fetch_next()
+                while pager.has_more():
+                    time.sleep(args.latency * 2 / 1000)  # lecture de la page affichée
+                    waits.append(timed(pager.fetch_next))
+            results[f"next_page.{mode}"] = summarize(waits, "ms")
+    return results
+
+
+def bench_translation(core, stubs, args):
+    """Temps de traduction par recette, sans puis avec le cache de traductions"""
+    recipes = parse_themealdb({"meals": [make_meal("t", n) for n in range(args.repeat)]})
+    cold = [timed(core.translate_recipe, recipe, "fr") for recipe in recipes]
+    warm = [timed(core.translate_recipe, recipe, "fr") for recipe in recipes]
+    return {
+        "translate_recipe.cold": summarize(cold, "ms"),
+        "translate_recipe.cached": summarize(warm, "ms"),
+    }
+
+
+def bench_favorites(core, stubs, args):
+    """Débit d'écriture et de relecture des favoris, unitaire et par lots JSON-lines"""
+    rates = []
+    for run in range(args.repeat):
+        recipes = parse_themealdb({"meals": [make_meal(f"fav{run}", n) for n in range(args.favorites)]})
+        elapsed = timed(lambda: [core.favorites.save(recipe) for recipe in recipes]) / 1000
+        rates.append(len(recipes) / elapsed)
+    loads = []
+    for _ in range(args.repeat):
+        elapsed = timed(core.favorites.load_all) / 1000
+        loads.append(args.favorites * args.repeat / elapsed)
+
+    lines = [json.dumps(recipe.to_dict()) for recipe in parse_themealdb(
+        {"meals": [make_meal("bulk", n) for n in range(args.bulk_size)]})]
+    elapsed = timed(core.favorites.import_jsonl, lines) / 1000
+    exported = StringIO()
+    total = sum(1 for _ in core.favorites.iter_all())
+    export_elapsed = timed(core.favorites.export_jsonl, exported) / 1000
+    reimport_elapsed = timed(core.favorites.import_jsonl, lines) / 1000
+    return {
+        "favorites.save": summarize(rates, "writes/s", better="higher"),
+        "favorites.load_all": summarize(loads, "recipes/s", better="higher"),
+        "favorites.import": summarize([len(lines) / elapsed], "recipes/s", better="higher"),
+        "favorites.reimport": summarize([len(lines) / reimport_elapsed], "recipes/s", better="higher"),
+        "favorites.export": summarize([total / export_elapsed], "recipes/s", better="higher"),
+    }
+
+
+def bench_similar(core, stubs, args):
+    """Index de recettes similaires : ajout incrémental et requêtes top-k"""
+    rng = random.Random(19)
+    foods = [f"food{n} {rng.choice(['fresh', 'dried', 'ground', 'chopped', ''])}" for n in range(600)]
+    recipes = [Recipe(f"s{n}", f"Similar {n}", tuple(ingredient("1", "g", food) for food in rng.sample(foods, 10)),
+                      source="bench")
+               for n in range(args.similar_size)]
+    index = SimilarIndex()
+    elapsed = timed(index.add_many, recipes) / 1000
+    queries = [timed(index.similar, recipe, 10) for recipe in rng.sample(recipes, args.repeat)]
+    return {
+        "similar.add": summarize([args.similar_size / elapsed], "recipes/s", better="higher"),
+        "similar.top10": summarize(queries, "ms"),
+    }
+
+
+COOKING_WORDS = ("chicken beef pork lamb salmon tuna shrimp tofu rice pasta spaghetti noodle potato tomato onion "
+                 "garlic lemon honey ginger curry soup stew salad pie tart cake bread roast grilled baked fried "
+                 "spicy sweet sour creamy smoky crispy stuffed glazed braised bolognese carbonara risotto tacos "
+                 "burrito lasagne pudding crumble casserole kebab teriyaki masala pesto chowder").split()
+
+
+def bench_suggest(core, stubs, args):
+    """Suggestions de titres : requêtes partielles ou mal orthographiées sur l'index de trigrammes"""
+    rng = random.Random(20)
+    index = TitleIndex()
+    index.add_many(Recipe(f"t{n}", " ".join(rng.sample(COOKING_WORDS, rng.randint(2, 4))), source="bench")
+                   for n in range(args.similar_size))
+    queries = []
+    for _ in range(args.repeat):
+        word = rng.choice(COOKING_WORDS)
+        position = rng.randrange(len(word))
+        queries.append(word[:position] + word[position + 1:])  # une lettre oubliée
+    return {"suggest.titles": summarize([timed(index.search, query, 10) for query in queries], "ms")}
+
+
+def bench_coalesce(core, stubs, args):
+    """Recherches identiques simultanées : un seul appel partagé"""
+    def burst(query):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: core.search("edamam", query), range(8)))
+
+    samples = [timed(burst, f"burst{n}") for n in range(args.repeat)]
+    return {"search.8_identical": summarize(samples, "ms")}
+
+
+def bench_shopping(core, stubs, args):
+    """Liste de courses de 200 favoris : analyse des quantités à froid, puis avec le cache"""
+    rng = random.Random(23)
+    foods = [f"{rng.choice(COOKING_WORDS)} {n}" for n in range(400)]
+    recipes = [Recipe(f"shop{n}", f"Shopping {n}",
+                      tuple(ingredient(*split_measure(rng.choice(MEASURES)), rng.choice(foods)) for _ in range(12)),
+                      source="bench")
+               for n in range(200)]
+    core.favorites.save_many(recipes)
+    ids = [recipe.id for recipe in recipes]
+
+    cold = []
+    for _ in range(args.repeat):
+        for cached in (normalize_ingredient, parse_quantity, parse_unit):
+            cached.cache_clear()
+        cold.append(timed(core.shopping_list, ids))
+    warm = [timed(core.shopping_list, ids) for _ in range(args.repeat)]
+    return {
+        "shopping_list.200.cold": summarize(cold, "ms"),
+        "shopping_list.200.cached": summarize(warm, "ms"),
+    }
+
+
+def bench_book(core, stubs, args):
+    """Livre de recettes HTML : premier export (images téléchargées), puis exports incrémentaux"""
+    recipes = parse_themealdb({"meals": [make_meal("book", n) for n in range(args.book_size)]})
+    for recipe in recipes:
+        recipe.image_url = stubs.url(recipe.image_url)
+    core.favorites.save_many(recipes)
+    ids = [recipe.id for recipe in recipes]
+    out_dir = core.path("bench-book")
+
+    cold = timed(core.export_recipe_book, out_dir, ids, args.jobs) / 1000
+    unchanged = timed(core.export_recipe_book, out_dir, ids, args.jobs) / 1000
+    core.favorites.save_many(recipe.copy(title=f"{recipe.title} v2") for recipe in recipes[:10])
+    changed = timed(core.export_recipe_book, out_dir, ids, args.jobs) / 1000
+    return {
+        "book.export.cold": summarize([len(ids) / cold], "recipes/s", better="higher"),
+        "book.export.unchanged": summarize([len(ids) / unchanged], "recipes/s", better="higher"),
+        "book.export.10_changed": summarize([changed * 1000], "ms"),
+    }
+
+
+def bench_ui(core, stubs, args):
+    """Coût d'un changement de thème et de langue dans l'interface ; ignoré sans affichage"""
+    import tkinter as tk
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        return {}
+    from chefai import ChefAI
+
+    app = ChefAI(root, data_dir=core.data_dir)
+    try:
+        root.update()
+
+        def switch(toggle):
+            toggle()
+            root.update_idletasks()
+
+        themes = [timed(switch, app.toggle_theme) for _ in range(args.repeat)]
+        languages = [timed(switch, app.toggle_language) for _ in range(args.repeat)]
+    finally:
+        app.close()
+    return {
+        "ui.switch_theme": summarize(themes, "ms"),
+        "ui.switch_language": summarize(languages, "ms"),
+    }
+
+
+BENCHMARKS = {
+    "search": bench_search,
+    "parse": bench_parse,
+    "images": bench_images,
+    "decode": bench_decode,
+    "paging": bench_paging,
+    "translation": bench_translation,
+    "favorites": bench_favorites,
+    "prefetch": bench_prefetch,
+    "similar": bench_similar,
+    "suggest": bench_suggest,
+    "coalesce": bench_coalesce,
+    "shopping": bench_shopping,
+    "book": bench_book,
+    "ui": bench_ui,
+}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    """Lance les mesures demandées ; renvoie le rapport JSON"""
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "config": {name: getattr(args, name)
+                       for name in ("latency", "meals", "pages", "instructions_size", "image_size",
+                                    "repeat", "parse_size", "favorites", "similar_size")},
+        },
+        "results": {},
+    }
+    with StubServers(args.latency / 1000, args.meals, args.instructions_size, tuple(args.image_size),
+                     args.pages) as stubs, \
+            tempfile.TemporaryDirectory(prefix="chefai-bench-") as data_dir:
+        # Pas de limite de débit : on mesure ChefAI, pas les quotas des fournisseurs
+        unlimited = (1e9, 1e9)
+        http = HttpClient(pool_maxsize=8, rate_limits={"themealdb": unlimited, "edamam": unlimited, "images": unlimited})
+        core = ChefCore(
+            data_dir=data_dir,
+            http=http,
+            urls={
+                "themealdb": stubs.url("/themealdb/search.php"),
+                "themealdb_lookup": stubs.url("/themealdb/lookup.php"),
+                "edamam": stubs.url("/edamam/recipes/v2"),
+            },
+            translator=StubTranslator(http, stubs.url("/translate")),
+        )
+        try:
+            for name in args.benchmarks or BENCHMARKS:
+                print(f"{name}...", file=sys.stderr, flush=True)
+                report["results"].update(BENCHMARKS[name](core, stubs, args))
+        finally:
+            core.close()
+    # Détail des spans internes, pour situer une régression
+    report["metrics"] = metrics.snapshot()
+    return report
+
+
+def compare(baseline, report, threshold=None):
+    """Affiche l'écart des médianes avec un rapport précédent ; renvoie les régressions"""
+    regressions = []
+    for name, current in report["results"].items():
+        previous = baseline["results"].get(name)
+        if not previous or not previous["median"]:
+            continue
+        change = (current["median"] - previous["median"]) / previous["median"] * 100
+        worse = change if current["better"] == "lower" else -change
+        flag = ""
+        if threshold is not None and worse > threshold:
+            regressions.append(name)
+            flag = "  <-- régression"
+        print(f"{name:40} {previous['median']:12.2f} -> {current['median']:12.2f} {current['unit']:10} "
+              f"{change:+7.1f}%{flag}", file=sys.stderr)
+    return regressions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="chefai-bench", description="Banc de mesure hors ligne de ChefAI")
+    parser.add_argument("benchmarks", nargs="*", metavar="MESURE",
+                        help=f"mesures à lancer parmi {', '.join(BENCHMARKS)} (toutes par défaut)")
+    parser.add_argument("-o", "--output", default="-", help="fichier JSON des résultats (défaut : sortie standard)")
+    parser.add_argument("--latency", type=float, default=20, help="latence des serveurs locaux, en ms")
+    parser.add_argument("--meals", type=int, default=25, help="recettes par réponse de recherche")
+    parser.add_argument("--pages", type=int, default=5, help="pages Edamam servies par recherche")
+    parser.add_argument("--instructions-size", type=int, default=600, help="taille des instructions, en caractères")
+    parser.add_argument("--image-size", type=int, nargs=2, default=[1280, 960], metavar=("W", "H"),
+                        help="dimensions des images servies")
+    parser.add_argument("--repeat", type=int, default=20, help="répétitions par mesure")
+    parser.add_argument("--parse-size", type=int, default=2000, help="recettes par réponse pour le débit d'analyse")
+    parser.add_argument("--favorites", type=int, default=200, help="favoris écrits par répétition")
+    parser.add_argument("--book-size", type=int, default=300, help="favoris exportés en livre de recettes")
+    parser.add_argument("-j", "--jobs", type=int, default=4, help="exports simultanés du livre de recettes")
+    parser.add_argument("--bulk-size", type=int, default=20000, help="favoris importés et exportés en JSON-lines")
+    parser.add_argument("--similar-size", type=int, default=5000,
+                        help="recettes des index de recettes similaires et de titres")
+    parser.add_argument("--compare", metavar="FICHIER", help="rapport JSON précédent à comparer")
+    parser.add_argument("--fail-above", type=float, metavar="POURCENT",
+                        help="code de sortie 1 si une médiane se dégrade de plus de POURCENT")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"mesure inconnue : {', '.join(unknown)}")
+    report = run(args)
+
+    text = json.dumps(report, indent=2)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as output:
+            output.write(text + "\n")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as previous:
+            if compare(json.load(previous), report, args.fail_above):
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""ChefAI en ligne de commande : recherches, traductions et exports par lots
+
+Exemples :
+    python chefai_cli.py search requetes.txt --source all --translate fr --jobs 4 -o resultats.jsonl
+    python chefai_cli.py translate favoris.jsonl --lang fr -o traductions.jsonl
+    python chefai_cli.py export -o favoris.jsonl
+    python chefai_cli.py import favoris.jsonl
+    python chefai_cli.py shopping 52772 52959 -o courses.jsonl
+    python chefai_cli.py book livre/ --jobs 8
+    python chefai_cli.py sync
+"""
+import argparse
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from chefai_core import ChefCore
+from metrics import metrics
+from recipe import Recipe
+
+
+def read_lines(path):
+    """Lit les lignes non vides d'un fichier ("-" pour l'entrée standard)"""
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        for line in stream:
+            line = line.strip()
+            if line:
+                yield line
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def write_jsonl(output, record):
+    output.write(json.dumps(record, ensure_ascii=False) + "\n")
+    output.flush()
+
+
+def run_search(core, query, source, translate_to, pages=1):
+    """Traite une requête ; renvoie un enregistrement JSON"""
+    record = {"query": query, "source": source}
+    try:
+        if source == "all":
+            recipes, errors = core.search_all(query)
+            if errors:
+                record["errors"] = errors
+        elif source == "edamam" and pages > 1:
+            pager = core.edamam_pager(query, max_pages=pages)
+            recipes = []
+            while pager.has_more():
+                recipes.extend(pager.fetch_next())
+        else:
+            recipes = core.search(source, query)
+        core.index_recipes(recipes)
+        record["recipes"] = [recipe.to_dict() for recipe in recipes]
+        if translate_to:
+            for recipe, output in zip(recipes, record["recipes"]):
+                output["translation"] = core.translate_recipe(recipe, translate_to)
+    except Exception as e:
+        metrics.error(f"search.{source}", e)
+        record["error"] = str(e)
+    return record
+
+
+def run_translate(core, recipe, target_lang):
+    """Traduit une recette (Recipe) ; renvoie un enregistrement JSON"""
+    record = {"id": recipe.id, "source": recipe.source, "lang": target_lang}
+    try:
+        record["translation"] = core.translate_recipe(recipe, target_lang)
+    except Exception as e:
+        metrics.error("translation", e)
+        record["error"] = str(e)
+    return record
+
+
+def command_search(core, args, output):
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        records = pool.map(lambda query: run_search(core, query, args.source, args.translate, args.pages),
+                           read_lines(args.queries))
+        for record in records:
+            write_jsonl(output, record)
+
+
+def command_translate(core, args, output):
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        records = pool.map(lambda line: run_translate(core, Recipe.from_dict(json.loads(line)), args.lang),
+                           read_lines(args.recipes))
+        for record in records:
+            write_jsonl(output, record)
+
+
+def command_export(core, args, output):
+    core.favorites.export_jsonl(output)
+
+
+def command_import(core, args, output):
+    stream = sys.stdin if args.recipes == "-" else open(args.recipes, encoding="utf-8")
+    try:
+        changed = core.favorites.import_jsonl(stream, batch_size=args.batch_size)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    write_jsonl(output, {"changed": changed})
+
+
+def command_shopping(core, args, output):
+    for item in core.shopping_list(args.ids or None):
+        write_jsonl(output, item.to_dict())
+
+
+def command_book(core, args, output):
+    def progress(done):
+        print(f"\r{done}", end="", file=sys.stderr, flush=True)
+    counts = core.export_recipe_book(args.out_dir, args.ids or None, max_workers=args.jobs, progress=progress)
+    print(file=sys.stderr)
+    write_jsonl(output, counts)
+
+
+def command_sync(core, args, output):
+    def progress(done, total):
+        print(f"\r{done}/{total}", end="", file=sys.stderr, flush=True)
+    changed = core.sync_catalog(progress=progress, max_workers=args.jobs)
+    print(file=sys.stderr)
+    write_jsonl(output, {"changed": changed})
+
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--data-dir", default=".", help="dossier des bases de données et caches")
+    common.add_argument("-o", "--output", default="-", help="fichier JSON-lines de sortie (défaut : sortie standard)")
+    common.add_argument("-j", "--jobs", type=int, default=4, help="nombre de traitements simultanés")
+    common.add_argument("--metrics", metavar="FICHIER",
+                        help="écrit les mesures de performance (Prometheus pour .prom, JSON sinon)")
+
+    parser = argparse.ArgumentParser(prog="chefai", description="ChefAI sans interface graphique")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    search = commands.add_parser("search", parents=[common], help="recherche chaque requête d'un fichier")
+    search.add_argument("queries", help="fichier de requêtes, une par ligne (\"-\" pour l'entrée standard)")
+    search.add_argument("--source", default="themealdb",
+                        choices=["themealdb", "edamam", "favorites", "pantry", "all"])
+    search.add_argument("--translate", choices=["fr", "en"], help="traduit aussi chaque recette")
+    search.add_argument("--pages", type=int, default=1, help="pages Edamam lues par requête (budget de requêtes)")
+    search.set_defaults(handler=command_search)
+
+    translate = commands.add_parser("translate", parents=[common], help="traduit des recettes au format JSON-lines")
+    translate.add_argument("recipes", help="fichier JSON-lines de recettes (\"-\" pour l'entrée standard)")
+    translate.add_argument("--lang", choices=["fr", "en"], default="fr")
+    translate.set_defaults(handler=command_translate)
+
+    export = commands.add_parser("export", parents=[common], help="exporte les favoris en JSON-lines")
+    export.set_defaults(handler=command_export)
+
+    load = commands.add_parser("import", parents=[common], help="ajoute ou met à jour des favoris depuis un JSON-lines")
+    load.add_argument("recipes", help="fichier JSON-lines de recettes (\"-\" pour l'entrée standard)")
+    load.add_argument("--batch-size", type=int, default=500, help="recettes écrites par transaction")
+    load.set_defaults(handler=command_import)
+
+    shopping = commands.add_parser("shopping", parents=[common], help="liste de courses de favoris")
+    shopping.add_argument("ids", nargs="*", help="id des recettes favorites (défaut : toutes)")
+    shopping.set_defaults(handler=command_shopping)
+
+    book = commands.add_parser("book", parents=[common], help="exporte les favoris en livre de recettes HTML")
+    book.add_argument("out_dir", help="dossier du livre, mis à jour par les exports suivants")
+    book.add_argument("ids", nargs="*", help="id des recettes favorites (défaut : toutes)")
+    book.set_defaults(handler=command_book)
+
+    sync = commands.add_parser("sync", parents=[common], help="synchronise le catalogue TheMealDB local")
+    sync.set_defaults(handler=command_sync)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    core = ChefCore(data_dir=args.data_dir)
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        args.handler(core, args, output)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        core.close()
+        if args.metrics:
+            metrics.export(args.metrics)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
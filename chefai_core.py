@@ -0,0 +1,470 @@
+import os
+import re
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from urllib.parse import parse_qsl, urlsplit
+
+from batch_translate import translate_segments
+from catalog import CatalogMirror
+from favorites_store import FavoritesStore
+from http_cache import HttpCache
+from image_cache import ImageCache
+from metrics import metrics
+from pager import Pager
+from pantry_index import PantryIndex
+from recipe_book import RecipeBook
+from recipe import Recipe, format_quantity, ingredient, split_measure
+from shopping_list import build_shopping_list
+from similar_index import SimilarIndex
+from single_flight import SingleFlight
+from title_index import TitleIndex
+from translation_cache import TranslationCache
+
+THEMEALDB_SEARCH_URL = "https://www.themealdb.com/api/json/v1/1/search.php"
+THEMEALDB_LOOKUP_URL = "https://www.themealdb.com/api/json/v1/1/lookup.php"
+EDAMAM_SEARCH_URL = "https://api.edamam.com/api/recipes/v2"
+
+# Points d'accès par défaut, remplaçables (serveurs de test, miroirs)
+DEFAULT_URLS = {
+    "themealdb": THEMEALDB_SEARCH_URL,
+    "themealdb_lookup": THEMEALDB_LOOKUP_URL,
+    "edamam": EDAMAM_SEARCH_URL,
+}
+
+
+def parse_themealdb(data):
+    """Convertit une réponse TheMealDB en liste de recettes"""
+    recipes = []
+    for meal in data.get("meals") or []:
+        ingredients = []
+        for i in range(1, 21):
+            food = meal.get(f"strIngredient{i}")
+            if food and food.strip():
+                ingredients.append(ingredient(*split_measure(meal.get(f"strMeasure{i}")), food.strip()))
+
+        recipes.append(Recipe(
+            meal["idMeal"],
+            meal["strMeal"],
+            tuple(ingredients),
+            meal["strInstructions"],
+            meal["strMealThumb"],
+            "themealdb"
+        ))
+    return recipes
+
+
+def parse_edamam(data):
+    """Convertit une réponse Edamam en liste de recettes"""
+    recipes = []
+    for hit in data.get("hits") or []:
+        recipe = hit["recipe"]
+        ingredients = tuple(
+            ingredient(format_quantity(item.get("quantity")), (item.get("measure") or "").lower(), item["food"])
+            for item in recipe.get("ingredients", [])
+        )
+
+        recipes.append(Recipe(
+            recipe["uri"].split("#")[1],
+            recipe["label"],
+            ingredients,
+            "\n".join(recipe.get("instructionLines", ["No instructions available"])),
+            recipe["image"],
+            "edamam"
+        ))
+    return recipes
+
+
+def normalize_text(text):
+    """Minuscules, sans accents ni ponctuation"""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def recipe_key(recipe):
+    """Clé de dédoublonnage : titre et ensemble d'ingrédients normalisés"""
+    return (
+        normalize_text(recipe.title),
+        frozenset(normalize_text(food) for _, _, food in recipe.ingredients)
+    )
+
+
+def recipe_segments(recipe):
+    """Segments traduisibles d'une recette : titre, lignes d'ingrédients, instructions"""
+    return [recipe.title] + recipe.ingredient_lines() + [recipe.instructions]
+
+
+class ChefCore:
+    """Logique de ChefAI sans interface : fournisseurs, traduction, favoris et index locaux
+
+    Aucune méthode n'affiche de message : les erreurs sont levées à l'appelant.
+    Les connexions, bases et dépendances lourdes (requests, googletrans) ne
+    sont ouvertes ou importées qu'à leur première utilisation.
+    """
+
+    def __init__(self, data_dir=".", api_keys=None, page_size=50, http=None, urls=None, translator=None,
+                 edamam_max_pages=5):
+        self.data_dir = data_dir
+        self.page_size = page_size
+        self.edamam_max_pages = edamam_max_pages  # budget de requêtes par recherche paginée
+        self.urls = dict(DEFAULT_URLS, **(urls or {}))
+
+        # Clés API (à remplacer par vos propres clés)
+        self.api_keys = api_keys or {
+            "edamam": {
+                "app_id": os.environ.get("EDAMAM_APP_ID", "YOUR_EDAMAM_APP_ID"),
+                "app_key": os.environ.get("EDAMAM_APP_KEY", "YOUR_EDAMAM_APP_KEY")
+            }
+        }
+
+        self._resources = {}
+        self._resources_lock = Lock()
+        if http is not None:
+            self._resources["http"] = http
+        if translator is not None:
+            self._resources["translator"] = translator
+        self.translation_pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix="chefai-translate")
+        # Recherches et traductions identiques simultanées : un seul appel, résultat partagé
+        self.flights = SingleFlight()
+
+        self.pantry_index = PantryIndex()
+        self.similar_index = SimilarIndex()
+        self.title_index = TitleIndex()
+        self._indexes_lock = Lock()
+        self._indexes_loaded = False
+
+        self.providers = {
+            "themealdb": self.search_themealdb,
+            "edamam": self.search_edamam,
+            "favorites": self.search_favorites,
+            "pantry": self.search_pantry
+        }
+        self.federated_providers = ("themealdb", "edamam", "favorites")
+        # Sources locales capables de ne renvoyer que des résumés (search(summary=True))
+        self.summary_providers = {"themealdb", "favorites"}
+
+    def path(self, name):
+        """Chemin d'un fichier de données"""
+        return os.path.join(self.data_dir, name)
+
+    def _resource(self, name, factory):
+        """Crée une ressource coûteuse à sa première utilisation"""
+        resource = self._resources.get(name)
+        if resource is None:
+            with self._resources_lock:
+                resource = self._resources.get(name)
+                if resource is None:
+                    resource = self._resources[name] = factory()
+        return resource
+
+    @property
+    def http(self):
+        def create():
+            from network import HttpClient
+            return HttpClient(pool_maxsize=8)
+        return self._resource("http", create)
+
+    @property
+    def http_cache(self):
+        return self._resource("http_cache", lambda: HttpCache(self.path("http_cache.db")))
+
+    @property
+    def translation_cache(self):
+        return self._resource("translation_cache", lambda: TranslationCache(self.path("translations.db")))
+
+    @property
+    def catalog(self):
+        return self._resource("catalog", lambda: CatalogMirror(self.path("catalog.db"), url=self.urls["themealdb"]))
+
+    @property
+    def favorites(self):
+        return self._resource("favorites", lambda: FavoritesStore(self.path("favorites.db"), page_size=self.page_size))
+
+    @property
+    def image_cache(self):
+        return self._resource("image_cache", lambda: ImageCache(self.path("thumbnails")))
+
+    @property
+    def translator(self):
+        def create():
+            from googletrans import Translator
+            return Translator()
+        return self._resource("translator", create)
+
+    def warm_up(self):
+        """Ouvre les bases et importe les dépendances lourdes (à appeler en arrière-plan)"""
+        for name in ("favorites", "http_cache", "translation_cache", "catalog", "http", "translator"):
+            getattr(self, name)
+
+    def search(self, provider, query, summary=False):
+        """Recherche auprès d'un fournisseur
+
+        Avec summary=True, les sources locales renvoient des recettes
+        partielles ("partial"), sans ingrédients ni instructions, à compléter
+        par load_details à la sélection. Les recherches identiques simultanées
+        (même requête normalisée) partagent un seul appel.
+        """
+        summary = summary and provider in self.summary_providers
+        key = (provider, normalize_text(query) if provider != "pantry" else query, summary)
+        return list(self.flights.do("search", key, self._search, provider, query, summary))
+
+    def _search(self, provider, query, summary):
+        with metrics.span("search", provider=provider):
+            if summary:
+                return self.providers[provider](query, summary=True)
+            return self.providers[provider](query)
+
+    def search_all(self, query):
+        """Recherche auprès de tous les fournisseurs, résultats dédoublonnés
+
+        Renvoie (recettes, erreurs par fournisseur).
+        """
+        recipes = []
+        errors = {}
+        seen = set()
+        for provider in self.federated_providers:
+            try:
+                results = self.search(provider, query)
+            except Exception as e:
+                errors[provider] = str(e)
+                continue
+            for recipe in results:
+                key = recipe_key(recipe)
+                if key not in seen:
+                    seen.add(key)
+                    recipes.append(recipe)
+        return recipes, errors
+
+    def search_themealdb(self, query, summary=False):
+        """Recherche sur TheMealDB API, ou dans le catalogue local une fois synchronisé"""
+        if self.catalog.is_synced() and summary:
+            return [Recipe(meal["idMeal"], meal["strMeal"], image_url=meal["strMealThumb"], source="themealdb",
+                           partial=True)
+                    for meal in self.catalog.search_summaries(query)]
+        if self.catalog.is_synced():
+            data = self.catalog.search(query)
+            with metrics.span("recipe.parse", provider="themealdb"):
+                return parse_themealdb(data)
+
+        data = self.http_cache.get_json(
+            "themealdb",
+            self.urls["themealdb"],
+            params={"s": query},
+            timeout=10,
+            fetch=self.http.fetcher("themealdb")
+        )
+        with metrics.span("recipe.parse", provider="themealdb"):
+            return parse_themealdb(data)
+
+    def search_edamam(self, query):
+        """Recherche sur Edamam API (première page)"""
+        return self.edamam_page(query)[0]
+
+    def _edamam_json(self, url, params):
+        params = dict(params, app_id=self.api_keys["edamam"]["app_id"], app_key=self.api_keys["edamam"]["app_key"])
+        return self.http_cache.get_json("edamam", url, params=params, timeout=10, fetch=self.http.fetcher("edamam"))
+
+    def edamam_page(self, query, next_url=None):
+        """Une page de résultats Edamam ; renvoie (recettes, lien _links.next ou None)"""
+        if next_url is None:
+            data = self._edamam_json(self.urls["edamam"], {"type": "public", "q": query})
+        else:
+            # Le lien de continuation porte tous les paramètres, dont _cont
+            parts = urlsplit(next_url)
+            data = self._edamam_json(f"{parts.scheme}://{parts.netloc}{parts.path}", dict(parse_qsl(parts.query)))
+        with metrics.span("recipe.parse", provider="edamam"):
+            recipes = parse_edamam(data)
+        return recipes, ((data.get("_links") or {}).get("next") or {}).get("href")
+
+    def edamam_pager(self, query, executor=None, max_pages=None):
+        """Pagination des résultats Edamam, préchargée sur executor et limitée à max_pages requêtes"""
+        return Pager(
+            lambda next_url: self.edamam_page(query, next_url),
+            executor=executor,
+            max_pages=max_pages or self.edamam_max_pages,
+            name="edamam_pages"
+        )
+
+    def load_details(self, recipe):
+        """Complète une recette partielle (résumé de liste, page éloignée) à partir de son id"""
+        if not recipe.partial:
+            return recipe
+        details = self.recipe_by_id(recipe.source, recipe.id)
+        if details is None:
+            raise LookupError(f"Recipe not found: {recipe.id}")
+        recipe.fill_details(details)
+        return recipe
+
+    def recipe_by_id(self, source, recipe_id):
+        """Recette complète par id : favoris, puis catalogue local ou API du fournisseur"""
+        recipe = self.favorites.get(recipe_id)
+        if recipe is not None:
+            return recipe
+        if source == "edamam":
+            data = self._edamam_json(f"{self.urls['edamam']}/{recipe_id.split('_', 1)[-1]}", {"type": "public"})
+            return parse_edamam({"hits": [data]})[0]
+
+        meal = self.catalog.get(recipe_id)
+        if meal is not None:
+            return parse_themealdb({"meals": [meal]})[0]
+        data = self.http_cache.get_json(
+            "themealdb",
+            self.urls["themealdb_lookup"],
+            params={"i": recipe_id},
+            timeout=10,
+            fetch=self.http.fetcher("themealdb")
+        )
+        recipes = parse_themealdb(data)
+        return recipes[0] if recipes else None
+
+    def search_favorites(self, query, page=0, summary=False):
+        """Recherche plein texte locale dans les favoris"""
+        return self.favorites.search(query, page, summary=summary)
+
+    def search_pantry(self, query):
+        """Classe les recettes connues selon les ingrédients disponibles"""
+        self.load_local_indexes()
+        pantry = [item for item in re.split(r"[,;\n]", query) if item.strip()]
+        return [
+            recipe.copy(pantry_match=(have, total))
+            for recipe, have, total in self.pantry_index.search(pantry, limit=self.page_size)
+        ]
+
+    def similar_recipes(self, recipe, limit=10):
+        """Recettes connues les plus proches par leurs ingrédients ; renvoie des (recette, score)"""
+        self.load_local_indexes()
+        with metrics.span("similar"):
+            # Copies : load_details complète la recette ouverte, pas le résumé de l'index
+            return [(similar.copy(), score) for similar, score in self.similar_index.similar(recipe, limit)]
+
+    def suggest_titles(self, query, limit=10):
+        """Recettes connues au titre proche de la saisie, même mal orthographiée
+
+        Ne bloque pas : renvoie [] tant que les index locaux ne sont pas chargés.
+        """
+        if not self._indexes_loaded:
+            return []
+        with metrics.span("suggest"):
+            return [recipe.copy() for recipe in self.title_index.search(query, limit)]
+
+    def load_local_indexes(self):
+        """Indexe une fois les recettes du cache de recherche, du catalogue et des favoris"""
+        with self._indexes_lock:
+            if self._indexes_loaded:
+                return
+            parsers = {"themealdb": parse_themealdb, "edamam": parse_edamam}
+            for provider, parser in parsers.items():
+                for data in self.http_cache.iter_bodies(provider):
+                    self.index_recipes(parser(data))
+            self.index_recipes(parse_themealdb({"meals": list(self.catalog.iter_meals())}))
+            self.index_recipes(self.favorites.load_all())
+            self._indexes_loaded = True
+
+    def index_recipes(self, recipes):
+        """Ajoute de nouveaux résultats aux index locaux"""
+        self.pantry_index.add_many(recipes)
+        self.similar_index.add_many(recipes)
+        self.title_index.add_many(recipes)
+
+    def sync_catalog(self, progress=None, max_workers=4):
+        """Synchronise le catalogue TheMealDB local
+
+        Si les index locaux sont déjà chargés, les recettes ajoutées par la
+        synchronisation y sont indexées ; sinon load_local_indexes les lira.
+        """
+        started = time.time()
+        changed = self.catalog.sync(
+            fetch=self.http.fetcher("themealdb"),
+            max_workers=max_workers,
+            progress=progress
+        )
+        with self._indexes_lock:
+            if self._indexes_loaded and changed:
+                self.index_recipes(parse_themealdb({"meals": list(self.catalog.iter_meals(since=started))}))
+        return changed
+
+    def image_fetcher(self, timeout=10):
+        """Fonction de téléchargement des images de recettes (réponse en flux)"""
+        def fetch(url):
+            return self.http.get(url, provider="images", timeout=timeout, stream=True)
+        return fetch
+
+    def translate_text(self, text, src_lang, target_lang):
+        """Appel unique au service de traduction"""
+        return self.flights.do("translation", (src_lang, target_lang, text), self._translate_call,
+                               text, src_lang, target_lang)
+
+    def _translate_call(self, text, src_lang, target_lang):
+        with metrics.span("translate.call", dest=target_lang):
+            return self.translator.translate(text, src=src_lang, dest=target_lang).text
+
+    def translate_recipe(self, recipe, target_lang):
+        """Traduit une recette ; renvoie titre, ingrédients et instructions traduits"""
+        src_lang = 'en' if target_lang == 'fr' else 'fr'
+        translated = translate_segments(
+            self.translate_text,
+            recipe_segments(recipe),
+            src_lang,
+            target_lang,
+            cache=self.translation_cache,
+            executor=self.translation_pool,
+            pinned=self.favorites.is_favorite(recipe.id)
+        )
+        return {
+            "title": translated[0],
+            "ingredients": "\n".join(translated[1:-1]),
+            "instructions": translated[-1]
+        }
+
+    def save_favorite(self, recipe):
+        """Enregistre une recette en favoris et épingle ses traductions"""
+        saved = self.favorites.save(recipe)
+
+        # Les traductions des favoris ne sont jamais évincées du cache
+        segments = recipe_segments(recipe)
+        self.translation_cache.pin("en", "fr", segments)
+        self.translation_cache.pin("fr", "en", segments)
+        return saved
+
+    def is_favorite(self, recipe_id):
+        """Indique si la recette est enregistrée en favoris"""
+        return self.favorites.is_favorite(recipe_id)
+
+    def shopping_list(self, recipe_ids=None):
+        """Liste de courses des favoris donnés (tous par défaut) ; renvoie des ShoppingItem"""
+        with metrics.span("shopping_list"):
+            if recipe_ids is None:
+                recipes = self.favorites.iter_all()
+            else:
+                recipes = filter(None, (self.favorites.get(recipe_id) for recipe_id in recipe_ids))
+            return build_shopping_list(recipes)
+
+    def export_recipe_book(self, out_dir, recipe_ids=None, max_workers=4, progress=None):
+        """Exporte les favoris donnés (tous par défaut) en livre de recettes HTML hors ligne
+
+        Avec recipe_ids, les autres recettes du livre restent tant qu'elles
+        sont encore en favoris.
+        """
+        def still_favorite(key):
+            return self.favorites.is_favorite(key.split(":", 1)[-1])
+
+        keep = None
+        if recipe_ids is None:
+            recipes = self.favorites.iter_all()
+        else:
+            recipes = filter(None, (self.favorites.get(recipe_id) for recipe_id in recipe_ids))
+            keep = still_favorite
+        book = RecipeBook(out_dir, self.image_cache, self.image_fetcher(), max_workers=max_workers)
+        return book.export(recipes, progress=progress, keep=keep)
+
+    def close(self):
+        """Libère les ressources ouvertes"""
+        self.translation_pool.shutdown(wait=False, cancel_futures=True)
+        with self._resources_lock:
+            for resource in self._resources.values():
+                close = getattr(resource, "close", None)
+                if close is not None:
+                    close()
+            self._resources.clear()
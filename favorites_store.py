@@ -0,0 +1,281 @@
+import itertools
+import json
+import re
+import sqlite3
+import threading
+
+from metrics import metrics
+from recipe import Recipe, pack_ingredients, parse_lines, unpack_ingredients
+
+# Colonnes lues pour une recette complète (voir from_row)
+RECIPE_COLUMNS = "id, title, items, instructions, image_url, source"
+
+# Requêtes fixes : le module sqlite3 garde leurs instructions préparées en cache
+INSERT_SQL = '''INSERT OR IGNORE INTO favorites
+                (id, title, ingredients, instructions, image_url, source, foods, items)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)'''
+UPSERT_SQL = '''INSERT INTO favorites
+                (id, title, ingredients, instructions, image_url, source, foods, items)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    title = excluded.title,
+                    ingredients = excluded.ingredients,
+                    instructions = excluded.instructions,
+                    image_url = excluded.image_url,
+                    source = excluded.source,
+                    foods = excluded.foods,
+                    items = excluded.items
+                WHERE (title, instructions, image_url, source, items)
+                      IS NOT (excluded.title, excluded.instructions, excluded.image_url,
+                              excluded.source, excluded.items)'''
+EXISTS_SQL = "SELECT 1 FROM favorites WHERE id = ?"
+GET_SQL = f"SELECT {RECIPE_COLUMNS} FROM favorites WHERE id = ?"
+PAGE_SQL = f"SELECT rowid, {RECIPE_COLUMNS} FROM favorites WHERE rowid > ? ORDER BY rowid LIMIT ?"
+
+
+def _create_table(c):
+    """Table des favoris, colonnes d'origine"""
+    c.execute('''CREATE TABLE IF NOT EXISTS favorites
+                (id TEXT PRIMARY KEY,
+                 title TEXT,
+                 ingredients TEXT,
+                 instructions TEXT,
+                 image_url TEXT,
+                 source TEXT)''')
+
+
+def _add_foods(c):
+    """Noms d'ingrédients structurés, un par ligne"""
+    if "foods" not in _columns(c):
+        c.execute("ALTER TABLE favorites ADD COLUMN foods TEXT")
+
+
+def _add_items(c):
+    """Ingrédients (quantité, unité, aliment) tabulés, un par ligne"""
+    if "items" in _columns(c):
+        return
+    c.execute("ALTER TABLE favorites ADD COLUMN items TEXT")
+    rows = c.execute("SELECT id, ingredients, foods FROM favorites").fetchall()
+    c.executemany("UPDATE favorites SET items = ? WHERE id = ?", [
+        (pack_ingredients(parse_lines(ingredients, foods.split("\n") if foods else ())), recipe_id)
+        for recipe_id, ingredients, foods in rows
+    ])
+
+
+def _create_fts(c):
+    """Index plein texte des favoris, synchronisé par triggers"""
+    if c.execute("SELECT 1 FROM sqlite_master WHERE name = 'favorites_fts'").fetchone():
+        return
+    c.execute('''CREATE VIRTUAL TABLE favorites_fts
+                USING fts5(id UNINDEXED, title, ingredients, instructions,
+                           tokenize = 'unicode61 remove_diacritics 2')''')
+    # Classement : le titre pèse plus que les ingrédients, eux-mêmes plus que les instructions
+    c.execute("INSERT INTO favorites_fts (favorites_fts, rank) VALUES ('rank', 'bm25(0.0, 10.0, 3.0, 1.0)')")
+
+
+def _sync_fts_by_rowid(c):
+    """Triggers FTS par rowid : une mise à jour ne parcourt plus tout l'index pour retrouver l'id
+
+    La table est recréée avec une clé entière explicite (num) : un rowid
+    implicite peut être renuméroté par VACUUM et ne plus correspondre à
+    celui de favorites_fts.
+    """
+    for trigger in ("favorites_ai", "favorites_ad", "favorites_au"):
+        c.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    c.execute('''CREATE TABLE favorites_new
+                (num INTEGER PRIMARY KEY,
+                 id TEXT UNIQUE,
+                 title TEXT,
+                 ingredients TEXT,
+                 instructions TEXT,
+                 image_url TEXT,
+                 source TEXT,
+                 foods TEXT,
+                 items TEXT)''')
+    c.execute('''INSERT INTO favorites_new
+                SELECT rowid, id, title, ingredients, instructions, image_url, source, foods, items
+                FROM favorites''')
+    c.execute("DROP TABLE favorites")
+    c.execute("ALTER TABLE favorites_new RENAME TO favorites")
+    c.execute('''CREATE TRIGGER favorites_ai AFTER INSERT ON favorites BEGIN
+                    INSERT INTO favorites_fts (rowid, id, title, ingredients, instructions)
+                    VALUES (new.rowid, new.id, new.title, new.ingredients, new.instructions);
+                END''')
+    c.execute('''CREATE TRIGGER favorites_ad AFTER DELETE ON favorites BEGIN
+                    DELETE FROM favorites_fts WHERE rowid = old.rowid;
+                END''')
+    c.execute('''CREATE TRIGGER favorites_au AFTER UPDATE ON favorites BEGIN
+                    DELETE FROM favorites_fts WHERE rowid = old.rowid;
+                    INSERT INTO favorites_fts (rowid, id, title, ingredients, instructions)
+                    VALUES (new.rowid, new.id, new.title, new.ingredients, new.instructions);
+                END''')
+    c.execute("DELETE FROM favorites_fts")
+    c.execute('''INSERT INTO favorites_fts (rowid, id, title, ingredients, instructions)
+                SELECT rowid, id, title, ingredients, instructions FROM favorites''')
+
+
+def _columns(c):
+    return [row[1] for row in c.execute("PRAGMA table_info(favorites)")]
+
+
+# Migrations du schéma, dans l'ordre : PRAGMA user_version compte celles déjà appliquées.
+# Les premières vérifient l'existant, pour les bases créées avant user_version.
+MIGRATIONS = [_create_table, _add_foods, _add_items, _create_fts, _sync_fts_by_rowid]
+
+
+class FavoritesStore:
+    """Recettes favorites (SQLite) avec index plein texte FTS5
+
+    Une seule connexion, ouverte en mode WAL et partagée sous verrou : les
+    lectures ne sont pas bloquées par une écriture en cours. save_many et
+    import_jsonl écrivent par lots, une transaction par lot ; iter_all et
+    export_jsonl lisent page par page, en mémoire constante.
+    """
+
+    def __init__(self, db_path="favorites.db", page_size=50):
+        self.db_path = db_path
+        self.page_size = page_size
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self.init_database()
+
+    def init_database(self):
+        """Applique les migrations du schéma pas encore passées"""
+        with self._lock, self._conn:
+            c = self._conn.cursor()
+            version = c.execute("PRAGMA user_version").fetchone()[0]
+            for migration in MIGRATIONS[version:]:
+                migration(c)
+            if version < len(MIGRATIONS):
+                c.execute(f"PRAGMA user_version = {len(MIGRATIONS)}")
+
+    @staticmethod
+    def _values(recipe):
+        return (recipe.id,
+                recipe.title,
+                recipe.ingredients_text,
+                recipe.instructions,
+                recipe.image_url,
+                recipe.source,
+                "\n".join(recipe.foods),
+                pack_ingredients(recipe.ingredients))
+
+    def save(self, recipe):
+        """Enregistre une recette ; renvoie False si elle l'était déjà"""
+        with self._lock, metrics.span("sqlite.write", table="favorites"), self._conn:
+            c = self._conn.execute(INSERT_SQL, self._values(recipe))
+        return c.rowcount > 0
+
+    def save_many(self, recipes, batch_size=500):
+        """Ajoute ou met à jour des recettes par lots ; renvoie le nombre de lignes modifiées
+
+        Une recette identique à celle enregistrée n'est pas réécrite.
+        """
+        changed = 0
+        recipes = iter(recipes)
+        while True:
+            batch = [self._values(recipe) for recipe in itertools.islice(recipes, batch_size)]
+            if not batch:
+                return changed
+            with self._lock, metrics.span("sqlite.write", table="favorites"), self._conn:
+                changed += self._conn.executemany(UPSERT_SQL, batch).rowcount
+
+    def is_favorite(self, recipe_id):
+        """Indique si la recette est enregistrée en favoris"""
+        with self._lock:
+            return self._conn.execute(EXISTS_SQL, (recipe_id,)).fetchone() is not None
+
+    def search(self, query, page=0, summary=False):
+        """Recherche plein texte locale dans les favoris, classée et paginée
+
+        Avec summary=True, seuls id, titre, image et source sont lus (recettes
+        partielles, complétées par get).
+        """
+        terms = re.findall(r"\w+", query.lower())
+        if not terms:
+            return []
+        match = " ".join(f'"{term}"*' for term in terms)
+        columns = "f.id, f.title, f.image_url, f.source" if summary else \
+            ", ".join(f"f.{column}" for column in RECIPE_COLUMNS.split(", "))
+
+        with self._lock:
+            rows = self._conn.execute(f'''SELECT {columns}
+                                         FROM (SELECT rowid, rank FROM favorites_fts
+                                               WHERE favorites_fts MATCH ?
+                                               ORDER BY rank LIMIT ? OFFSET ?) AS matches
+                                         JOIN favorites f ON f.rowid = matches.rowid
+                                         ORDER BY matches.rank''',
+                                      (match, self.page_size, page * self.page_size)).fetchall()
+
+        if summary:
+            return [Recipe(row[0], row[1], image_url=row[2], source=row[3], partial=True) for row in rows]
+        return [self.from_row(row) for row in rows]
+
+    def get(self, recipe_id):
+        """Recette favorite complète par id, ou None"""
+        with self._lock:
+            row = self._conn.execute(GET_SQL, (recipe_id,)).fetchone()
+        return self.from_row(row) if row else None
+
+    def iter_all(self, batch_size=500):
+        """Parcourt toutes les recettes favorites, lues par pages de batch_size
+
+        Le verrou est relâché entre deux pages : un long export ne bloque pas
+        les autres accès.
+        """
+        last = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(PAGE_SQL, (last, batch_size)).fetchall()
+            if not rows:
+                return
+            last = rows[-1][0]
+            for row in rows:
+                yield self.from_row(row[1:])
+
+    def load_all(self):
+        """Charge toutes les recettes favorites"""
+        return list(self.iter_all())
+
+    def export_jsonl(self, output):
+        """Écrit les favoris dans output, une recette JSON par ligne ; renvoie leur nombre"""
+        count = 0
+        with metrics.span("favorites.export"):
+            for recipe in self.iter_all():
+                output.write(json.dumps(recipe.to_dict(), ensure_ascii=False) + "\n")
+                count += 1
+        return count
+
+    def import_jsonl(self, lines, batch_size=500):
+        """Ajoute ou met à jour les recettes de lignes JSON (format de export_jsonl)
+
+        Les lignes sont lues au fur et à mesure : un fichier ouvert convient.
+        Renvoie le nombre de recettes ajoutées ou modifiées ; une ligne
+        invalide lève ValueError avec son numéro.
+        """
+        def recipes():
+            for number, line in enumerate(lines, 1):
+                if not line.strip():
+                    continue
+                try:
+                    recipe = Recipe.from_dict(json.loads(line))
+                except (ValueError, TypeError, AttributeError) as e:
+                    raise ValueError(f"ligne {number} : {e}") from e
+                if not recipe.id:
+                    raise ValueError(f"ligne {number} : recette sans id")
+                yield recipe
+
+        with metrics.span("favorites.import"):
+            return self.save_many(recipes(), batch_size)
+
+    @staticmethod
+    def from_row(row):
+        """Convertit une ligne de la table favorites (RECIPE_COLUMNS) en recette"""
+        return Recipe(row[0], row[1], unpack_ingredients(row[2]), row[3], row[4], row[5])
+
+    def close(self):
+        """Ferme la connexion SQLite"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,185 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from metrics import metrics
+
+# Paramètres d'authentification exclus de la clé de cache
+AUTH_PARAMS = {"app_id", "app_key"}
+
+# Texte de recherche saisi, normalisé dans la clé (casse, espaces) ; les
+# autres paramètres, comme le curseur _cont d'Edamam, sont gardés tels quels
+QUERY_PARAMS = {"q", "s", "f"}
+
+# Durées de vie par défaut (secondes) par fournisseur
+DEFAULT_TTLS = {
+    "themealdb": 24 * 3600,
+    "edamam": 6 * 3600,
+}
+
+
+class HttpCache:
+    """Cache persistant des réponses HTTP des API de recettes (SQLite)"""
+
+    def __init__(self, db_path="http_cache.db", ttls=None, default_ttl=3600,
+                 max_bytes=50 * 1024 * 1024):
+        self.db_path = db_path
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('''CREATE TABLE IF NOT EXISTS responses
+                            (key TEXT PRIMARY KEY,
+                             provider TEXT,
+                             url TEXT,
+                             body TEXT,
+                             etag TEXT,
+                             last_modified TEXT,
+                             fetched_at REAL,
+                             accessed_at REAL,
+                             size INTEGER)''')
+        self._conn.execute('''CREATE INDEX IF NOT EXISTS responses_lru
+                            ON responses (accessed_at)''')
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(provider, url, params=None):
+        """Construit la clé de cache à partir du fournisseur et des paramètres normalisés"""
+        normalized = []
+        for name, value in sorted((params or {}).items()):
+            if name in AUTH_PARAMS or value is None:
+                continue
+            value = str(value)
+            if name in QUERY_PARAMS:
+                value = " ".join(value.lower().split())
+            normalized.append((name, value))
+        raw = json.dumps([provider, url, normalized], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def ttl_for(self, provider):
+        """Durée de vie des entrées d'un fournisseur"""
+        return self.ttls.get(provider, self.default_ttl)
+
+    def get_json(self, provider, url, params=None, timeout=10, fetch=None):
+        """Renvoie la réponse JSON, depuis le cache si possible
+
+        Les entrées expirées sont revalidées via ETag/Last-Modified ; en cas
+        d'erreur réseau, de quota dépassé (429) ou d'erreur serveur, l'entrée
+        périmée est servie. Une autre réponse en erreur lève HTTPError.
+        """
+        import requests
+
+        fetch = fetch or requests.get
+        key = self.make_key(provider, url, params)
+        entry = self._lookup(key)
+        now = time.time()
+
+        if entry and now - entry["fetched_at"] < self.ttl_for(provider):
+            self._touch(key, now)
+            metrics.cache("http", "hit")
+            return self._decode(provider, entry["body"])
+
+        headers = {}
+        if entry:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            response = fetch(url, params=params, headers=headers, timeout=timeout)
+        except requests.RequestException:
+            if entry:
+                self._touch(key, now)
+                metrics.cache("http", "stale")
+                return self._decode(provider, entry["body"])
+            raise
+
+        if response.status_code == 304 and entry:
+            self._revalidate(key, now)
+            metrics.cache("http", "revalidated")
+            return self._decode(provider, entry["body"])
+
+        if (response.status_code == 429 or response.status_code >= 500) and entry:
+            self._touch(key, now)
+            metrics.cache("http", "stale")
+            return self._decode(provider, entry["body"])
+
+        metrics.cache("http", "miss")
+        if response.status_code != 200:
+            # Corps d'erreur : jamais passé aux parseurs comme des données
+            response.raise_for_status()
+            raise requests.HTTPError(f"Unexpected status {response.status_code}", response=response)
+        data = self._decode(provider, response.text)
+        self._store(key, provider, url, response.text,
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"), now)
+        return data
+
+    @staticmethod
+    def _decode(provider, body):
+        with metrics.span("json.parse", provider=provider):
+            return json.loads(body)
+
+    def _lookup(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                '''SELECT body, etag, last_modified, fetched_at
+                   FROM responses WHERE key = ?''', (key,)).fetchone()
+        if not row:
+            return None
+        return {"body": row[0], "etag": row[1], "last_modified": row[2], "fetched_at": row[3]}
+
+    def _touch(self, key, now):
+        with self._lock:
+            self._conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+            self._conn.commit()
+
+    def _revalidate(self, key, now):
+        with self._lock:
+            self._conn.execute('UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE key = ?',
+                               (now, now, key))
+            self._conn.commit()
+
+    def _store(self, key, provider, url, body, etag, last_modified, now):
+        size = len(body.encode("utf-8"))
+        with self._lock, metrics.span("sqlite.write", table="responses"):
+            self._conn.execute('''INSERT OR REPLACE INTO responses
+                                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                               (key, provider, url, body, etag, last_modified, now, now, size))
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Supprime les entrées les moins récemment utilisées au-delà de max_bytes"""
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute('SELECT key, size FROM responses ORDER BY accessed_at').fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+            total -= size
+
+    def iter_bodies(self, provider):
+        """Parcourt les réponses JSON en cache d'un fournisseur"""
+        with self._lock:
+            rows = self._conn.execute('SELECT body FROM responses WHERE provider = ?',
+                                      (provider,)).fetchall()
+        for (body,) in rows:
+            yield json.loads(body)
+
+    def clear(self):
+        """Vide le cache"""
+        with self._lock:
+            self._conn.execute('DELETE FROM responses')
+            self._conn.commit()
+
+    def close(self):
+        """Ferme la connexion SQLite"""
+        with self._lock:
+            self._conn.close()
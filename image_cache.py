@@ -0,0 +1,176 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+from metrics import metrics
+
+THUMBNAIL_SIZE = (350, 350)
+MAX_IMAGE_BYTES = 8 * 1024 * 1024  # au-delà, le téléchargement est abandonné
+
+
+class ImageTooLarge(OSError):
+    """Image plus lourde que la limite de téléchargement"""
+
+
+def read_body(response, max_bytes=MAX_IMAGE_BYTES, chunk_size=64 * 1024):
+    """Lit le corps d'une réponse en flux dans un tampon, sans dépasser max_bytes"""
+    length = response.headers.get("Content-Length", "")
+    if length.isdigit() and int(length) > max_bytes:
+        raise ImageTooLarge(f"Image too large: {length} bytes")
+
+    buffer = BytesIO()
+    for chunk in response.iter_content(chunk_size):
+        buffer.write(chunk)
+        if buffer.tell() > max_bytes:
+            raise ImageTooLarge(f"Image too large: more than {max_bytes} bytes")
+    buffer.seek(0)
+    return buffer
+
+
+def decode_thumbnail(stream, size=THUMBNAIL_SIZE):
+    """Décode une image directement à taille réduite puis la ramène à size
+
+    Pour les JPEG, draft() fait décoder les coefficients DCT à 1/2, 1/4 ou
+    1/8 de la résolution : l'image pleine taille n'est jamais allouée.
+    """
+    from PIL import Image
+
+    img = Image.open(stream)
+    if img.format == "JPEG":
+        img.draft("RGB", size)
+    img.load()
+    if img.width > size[0] or img.height > size[1]:
+        img.thumbnail(size)
+    return img
+
+
+class ImageCache:
+    """Cache d'images à deux niveaux : LRU mémoire et miniatures sur disque"""
+
+    def __init__(self, cache_dir="thumbnails", max_items=64, size=THUMBNAIL_SIZE, max_bytes=MAX_IMAGE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_items = max_items
+        self.size = size
+        self.max_bytes = max_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, url):
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.jpg")
+
+    def in_memory(self, url):
+        """Indique si la miniature est en mémoire, sans compter d'accès"""
+        with self._lock:
+            return url in self._memory
+
+    def get_memory(self, url):
+        """Renvoie la miniature en mémoire, ou None"""
+        with self._lock:
+            img = self._memory.get(url)
+            if img is not None:
+                self._memory.move_to_end(url)
+                self.memory_hits += 1
+        if img is not None:
+            metrics.cache("image", "memory")
+        return img
+
+    def get(self, url):
+        """Renvoie la miniature depuis la mémoire puis le disque, ou None"""
+        img = self.get_memory(url)
+        if img is not None:
+            return img
+
+        path = self._path(url)
+        if os.path.exists(path):
+            from PIL import Image
+
+            try:
+                with Image.open(path) as stored:
+                    img = stored.copy()
+            except OSError:
+                img = None
+            if img is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                metrics.cache("image", "disk")
+                self._remember(url, img)
+                return img
+
+        with self._lock:
+            self.misses += 1
+        metrics.cache("image", "miss")
+        return None
+
+    def load(self, url, fetch):
+        """Renvoie la miniature en cache, ou la télécharge avec fetch(url) et la met en cache
+
+        fetch doit renvoyer une réponse en flux (stream=True) ; à appeler hors du thread Tk.
+        """
+        img = self.get(url)
+        if img is None:
+            response = fetch(url)
+            try:
+                response.raise_for_status()
+                with metrics.span("image.download"):
+                    stream = read_body(response, self.max_bytes)
+            finally:
+                response.close()
+            with metrics.span("image.decode"):
+                img = decode_thumbnail(stream, self.size)
+            img = self.put(url, img)
+        return img
+
+    def file(self, url, fetch):
+        """Chemin de la miniature sur disque, téléchargée avec fetch(url) si absente
+
+        Une miniature déjà sur disque n'est ni relue ni décodée.
+        """
+        path = self._path(url)
+        if os.path.exists(path):
+            metrics.cache("image.file", "disk")
+            return path
+        metrics.cache("image.file", "miss")
+        self.load(url, fetch)
+        return path
+
+    def put(self, url, img):
+        """Réduit l'image si besoin et l'enregistre dans les deux niveaux"""
+        if img.width > self.size[0] or img.height > self.size[1]:
+            with metrics.span("image.thumbnail"):
+                img.thumbnail(self.size)
+        self._remember(url, img)
+
+        path = self._path(url)
+        tmp_path = f"{path}.tmp"
+        try:
+            with metrics.span("image.store"):
+                img.convert("RGB").save(tmp_path, "JPEG", quality=85)
+                os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return img
+
+    def _remember(self, url, img):
+        with self._lock:
+            self._memory[url] = img
+            self._memory.move_to_end(url)
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+
+    def stats(self):
+        """Compteurs de succès et d'échecs du cache"""
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory_items": len(self._memory),
+            }
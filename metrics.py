@@ -0,0 +1,212 @@
+import bisect
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Bornes des histogrammes de latence (secondes), comme les valeurs par défaut de Prometheus
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Histogramme de latences : compteurs cumulés par borne et fenêtre glissante pour les centiles"""
+
+    def __init__(self, window=512, buckets=BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, seconds):
+        self.bucket_counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.recent.append(seconds)
+
+    def summary(self):
+        """Nombre, somme et centiles des dernières mesures (secondes)"""
+        recent = sorted(self.recent)
+
+        def percentile(q):
+            return recent[min(len(recent) - 1, int(len(recent) * q))] if recent else None
+
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "p50": percentile(0.5),
+            "p90": percentile(0.9),
+            "p99": percentile(0.99),
+            "max": recent[-1] if recent else None,
+        }
+
+
+class Metrics:
+    """Mesures de l'application : durées (spans), compteurs, succès des caches et erreurs récentes"""
+
+    def __init__(self, window=512, max_errors=50):
+        self.window = window
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self.errors = deque(maxlen=max_errors)
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+    def observe(self, name, seconds, **labels):
+        """Enregistre une durée en secondes"""
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.window)
+            histogram.observe(seconds)
+
+    @contextmanager
+    def span(self, name, **labels):
+        """Mesure la durée du bloc, même s'il lève une exception"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def count(self, name, value=1, **labels):
+        """Incrémente un compteur"""
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def cache(self, name, result):
+        """Compte un accès au cache name ("miss" pour un échec, tout autre résultat est un succès)"""
+        self.count("cache", cache=name, result=result)
+
+    def error(self, where, exc):
+        """Compte une erreur et la garde dans la liste des erreurs récentes"""
+        self.count("errors", where=where)
+        with self._lock:
+            self.errors.append({
+                "time": time.time(),
+                "where": where,
+                "error": f"{type(exc).__name__}: {exc}",
+            })
+
+    def hit_ratios(self):
+        """Taux de succès de chaque cache"""
+        totals = {}
+        with self._lock:
+            for (name, labels), value in self._counters.items():
+                if name != "cache":
+                    continue
+                labels = dict(labels)
+                hits, total = totals.get(labels["cache"], (0, 0))
+                if labels["result"] != "miss":
+                    hits += value
+                totals[labels["cache"]] = (hits, total + value)
+        return {cache: hits / total for cache, (hits, total) in totals.items() if total}
+
+    def snapshot(self):
+        """État courant des mesures, sérialisable en JSON"""
+        with self._lock:
+            spans = [dict(name=name, labels=dict(labels), **histogram.summary())
+                     for (name, labels), histogram in sorted(self._histograms.items())]
+            counters = [{"name": name, "labels": dict(labels), "value": value}
+                        for (name, labels), value in sorted(self._counters.items())]
+            errors = list(self.errors)
+        return {
+            "time": time.time(),
+            "spans": spans,
+            "counters": counters,
+            "cache_hit_ratio": self.hit_ratios(),
+            "errors": errors,
+        }
+
+    def to_json(self):
+        """Export JSON"""
+        return json.dumps(self.snapshot(), indent=2, ensure_ascii=False)
+
+    def to_prometheus(self, prefix="chefai"):
+        """Export au format texte de Prometheus"""
+        def metric_name(name, suffix):
+            return f"{prefix}_{name.replace('.', '_')}_{suffix}"
+
+        def escape(value):
+            return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+        def label_text(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{label}="{escape(value)}"' for label, value in pairs) + "}"
+
+        lines = []
+        with self._lock:
+            declared = set()
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                base = metric_name(name, "seconds")
+                if base not in declared:
+                    declared.add(base)
+                    lines.append(f"# TYPE {base} histogram")
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + (float("inf"),), histogram.bucket_counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{base}_bucket{label_text(labels, [('le', le)])} {cumulative}")
+                lines.append(f"{base}_sum{label_text(labels)} {histogram.sum}")
+                lines.append(f"{base}_count{label_text(labels)} {histogram.count}")
+            for (name, labels), value in sorted(self._counters.items()):
+                base = metric_name(name, "total")
+                if base not in declared:
+                    declared.add(base)
+                    lines.append(f"# TYPE {base} counter")
+                lines.append(f"{base}{label_text(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def to_text(self):
+        """Résumé lisible pour le panneau de statistiques"""
+        snapshot = self.snapshot()
+
+        def ms(seconds):
+            return "-" if seconds is None else f"{seconds * 1000:.1f}"
+
+        lines = [f"{'span':38} {'n':>7} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9}"]
+        for span in snapshot["spans"]:
+            labels = ",".join(f"{label}={value}" for label, value in span["labels"].items())
+            name = f"{span['name']}{{{labels}}}" if labels else span["name"]
+            lines.append(f"{name:38} {span['count']:>7} {ms(span['p50']):>9} {ms(span['p90']):>9} {ms(span['p99']):>9}")
+
+        lines.append("")
+        for cache, ratio in sorted(snapshot["cache_hit_ratio"].items()):
+            lines.append(f"cache {cache:32} {ratio * 100:6.1f} %")
+
+        if snapshot["errors"]:
+            lines.append("")
+            for error in reversed(snapshot["errors"]):
+                stamp = time.strftime("%H:%M:%S", time.localtime(error["time"]))
+                lines.append(f"{stamp} {error['where']}: {error['error']}")
+        return "\n".join(lines)
+
+    def export(self, path, fmt=None):
+        """Écrit les mesures dans un fichier, au format "json" ou "prometheus"
+
+        Sans format explicite, les fichiers .prom et .txt sont écrits pour Prometheus.
+        """
+        if fmt is None:
+            fmt = "prometheus" if path.endswith((".prom", ".txt")) else "json"
+        text = self.to_prometheus() if fmt == "prometheus" else self.to_json()
+        with open(path, "w", encoding="utf-8") as output:
+            output.write(text)
+
+    def reset(self):
+        """Remet toutes les mesures à zéro"""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self.errors.clear()
+
+
+# Registre partagé par toute l'application
+metrics = Metrics()
@@ -0,0 +1,136 @@
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import metrics
+
+# Statuts HTTP qui justifient une nouvelle tentative
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Limites de débit par fournisseur : (requêtes par seconde, rafale maximale)
+DEFAULT_RATE_LIMITS = {
+    "edamam": (10 / 60, 10),
+    "themealdb": (5, 10),
+    "images": (10, 20),
+}
+
+
+class RateLimited(requests.RequestException):
+    """Quota du fournisseur épuisé pendant tout le délai d'attente"""
+
+
+class TokenBucket:
+    """Limiteur de débit à seau de jetons"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self):
+        """Prend un jeton s'il y en a un, sans attendre"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def available(self):
+        """Jetons disponibles en ce moment"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+    def acquire(self, timeout=None):
+        """Attend un jeton ; renvoie False si le délai est dépassé"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None:
+                if now + wait > deadline:
+                    return False
+            time.sleep(wait)
+
+
+class HttpClient:
+    """Session HTTP partagée : pool de connexions par hôte, nouvelles tentatives
+    avec attente exponentielle aléatoire, et limite de débit par fournisseur"""
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, max_retries=3,
+                 backoff_factor=0.5, backoff_max=10, rate_limits=None):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        limits = dict(DEFAULT_RATE_LIMITS, **(rate_limits or {}))
+        self.buckets = {provider: TokenBucket(rate, capacity) for provider, (rate, capacity) in limits.items()}
+
+    def backoff(self, attempt):
+        """Délai avant la tentative suivante (full jitter)"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_factor * 2 ** attempt))
+
+    def get(self, url, provider=None, params=None, headers=None, timeout=10, stream=False):
+        """GET avec limite de débit et nouvelles tentatives sur erreur réseau, 429 et 5xx"""
+        bucket = self.buckets.get(provider)
+        label = provider or "other"
+        for attempt in range(self.max_retries + 1):
+            if bucket is not None and not bucket.acquire(timeout):
+                metrics.count("http.rate_limited", provider=label)
+                raise RateLimited(f"Rate limit reached for {provider}")
+
+            last_attempt = attempt == self.max_retries
+            try:
+                with metrics.span("http.fetch", provider=label):
+                    response = self.session.get(url, params=params, headers=headers, timeout=timeout, stream=stream)
+            except (requests.ConnectionError, requests.Timeout):
+                if last_attempt:
+                    raise
+                metrics.count("http.retries", provider=label)
+                time.sleep(self.backoff(attempt))
+                continue
+
+            if response.status_code not in RETRY_STATUSES or last_attempt:
+                return response
+
+            metrics.count("http.retries", provider=label)
+            delay = self.backoff(attempt)
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                delay = min(self.backoff_max, int(retry_after))
+            response.close()
+            time.sleep(delay)
+
+    def has_capacity(self, provider, reserve=1):
+        """Indique s'il reste des jetons au-delà de reserve, pour un travail facultatif (préchargement)"""
+        bucket = self.buckets.get(provider)
+        return bucket is None or bucket.available() >= reserve + 1
+
+    def fetcher(self, provider):
+        """Fonction de téléchargement liée à un fournisseur, au format de requests.get"""
+        def fetch(url, params=None, headers=None, timeout=10, stream=False):
+            return self.get(url, provider=provider, params=params, headers=headers,
+                            timeout=timeout, stream=stream)
+        return fetch
+
+    def close(self):
+        """Ferme les connexions du pool"""
+        self.session.close()
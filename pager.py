@@ -0,0 +1,107 @@
+import threading
+
+from metrics import metrics
+
+
+class Pager:
+    """Pages successives d'une recherche avec continuation
+
+    fetch_page(curseur) renvoie (recettes, curseur suivant ou None) ; le
+    premier appel reçoit None. Chaque page consommée déclenche le
+    préchargement de la suivante sur l'exécuteur, dans la limite de
+    max_pages requêtes. Les pages à plus de keep_pages de la page visible
+    perdent leurs détails (Recipe.strip_details) : les index locaux gardant
+    leurs propres résumés, ces détails ne sont plus référencés ailleurs.
+    """
+
+    def __init__(self, fetch_page, executor=None, max_pages=5, keep_pages=2, name="pager"):
+        self.fetch_page = fetch_page
+        self.executor = executor
+        self.max_pages = max_pages
+        self.keep_pages = keep_pages
+        self.name = name
+        self.pages = []
+        self.requested = 0
+        self._cursor = None  # curseur de la prochaine page non consommée
+        self._started = False
+        self._prefetch = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def has_more(self):
+        """Indique s'il reste une page à charger dans le budget"""
+        with self._lock:
+            return self._has_more()
+
+    def _has_more(self):
+        if self._closed:
+            return False
+        if not self._started:
+            return True
+        if self._cursor is None:
+            return False
+        return self._prefetch is not None or self.requested < self.max_pages
+
+    def _submit(self, cursor):
+        self.requested += 1
+        metrics.count("pager.requests", pager=self.name)
+        if self.executor is None:
+            return None
+        return self.executor.submit(self.fetch_page, cursor)
+
+    def fetch_next(self):
+        """Renvoie la page suivante ([] s'il n'y en a plus) et précharge celle d'après
+
+        Bloquant : à appeler hors du thread Tk. En cas d'erreur, la même page
+        peut être redemandée.
+        """
+        with self._lock:
+            if not self._has_more():
+                return []
+            future, self._prefetch = self._prefetch, None
+            cursor = self._cursor
+            if future is None:
+                future = self._submit(cursor)
+                metrics.cache(self.name, "miss")
+            else:
+                metrics.cache(self.name, "hit" if future.done() else "pending")
+
+        recipes, next_cursor = future.result() if future is not None else self.fetch_page(cursor)
+
+        with self._lock:
+            if self._closed:
+                return []
+            self._started = True
+            self.pages.append(list(recipes))
+            self._cursor = next_cursor
+            if next_cursor is not None and self.requested < self.max_pages and self.executor is not None:
+                self._prefetch = self._submit(next_cursor)
+        return recipes
+
+    def page_of(self, index):
+        """Numéro de la page contenant la recette d'indice index"""
+        with self._lock:
+            for page_number, page in enumerate(self.pages):
+                if index < len(page):
+                    return page_number
+                index -= len(page)
+            return max(len(self.pages) - 1, 0)
+
+    def evict_far(self, visible_page, keep=()):
+        """Allège les recettes des pages éloignées de la page visible, sauf celles de keep"""
+        keep_ids = {id(recipe) for recipe in keep}
+        with self._lock:
+            pages = list(enumerate(self.pages))
+        for page_number, page in pages:
+            if abs(page_number - visible_page) > self.keep_pages:
+                for recipe in page:
+                    if id(recipe) not in keep_ids and not recipe.partial:
+                        recipe.strip_details()
+
+    def close(self):
+        """Abandonne le préchargement en cours"""
+        with self._lock:
+            self._closed = True
+            if self._prefetch is not None:
+                self._prefetch.cancel()
+                self._prefetch = None
@@ -0,0 +1,131 @@
+import re
+import threading
+import unicodedata
+from functools import lru_cache
+
+
+@lru_cache(maxsize=8192)
+def normalize_food(food):
+    """Normalise un nom d'ingrédient : minuscules, sans accents, au singulier"""
+    food = unicodedata.normalize("NFKD", food or "")
+    food = "".join(c for c in food if not unicodedata.combining(c))
+    words = []
+    for word in re.findall(r"[a-z]+", food.lower()):
+        if len(word) > 3 and word.endswith("ies"):
+            word = word[:-3] + "y"
+        elif len(word) > 3 and word.endswith("oes"):
+            word = word[:-2]
+        elif len(word) > 2 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.append(word)
+    return " ".join(words)
+
+
+def iter_bits(bitset):
+    """Positions des bits à 1 d'un entier, en temps linéaire"""
+    digits = bin(bitset)[:1:-1]
+    position = digits.find("1")
+    while position != -1:
+        yield position
+        position = digits.find("1", position + 1)
+
+
+class PantryIndex:
+    """Index inversé ingrédient -> recettes, avec score par bitsets
+
+    Chaque recette est représentée par un entier dont les bits sont les
+    ingrédients qu'elle utilise ; chaque ingrédient pointe vers la liste des
+    recettes qui l'utilisent. L'index garde un résumé de chaque recette
+    (Recipe.summary), pas ses ingrédients.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.recipes = []
+        self._slots = {}
+        self._masks = []
+        self._counts = []
+        self.food_ids = {}
+        self._postings = []
+        self._token_foods = {}
+
+    def __len__(self):
+        return len(self.recipes)
+
+    def _food_id(self, food):
+        food_id = self.food_ids.get(food)
+        if food_id is None:
+            food_id = len(self.food_ids)
+            self.food_ids[food] = food_id
+            self._postings.append([])
+            for token in food.split():
+                self._token_foods[token] = self._token_foods.get(token, 0) | (1 << food_id)
+        return food_id
+
+    def add(self, recipe):
+        """Ajoute une recette (Recipe), ignorée si déjà indexée"""
+        key = (recipe.source, recipe.id)
+        foods = {normalize_food(food) for _, _, food in recipe.ingredients}
+        foods.discard("")
+        with self._lock:
+            if key in self._slots or not foods:
+                return
+            slot = len(self.recipes)
+            self._slots[key] = slot
+            self.recipes.append(recipe.summary())
+            mask = 0
+            for food in foods:
+                food_id = self._food_id(food)
+                mask |= 1 << food_id
+                self._postings[food_id].append(slot)
+            self._masks.append(mask)
+            self._counts.append(len(foods))
+
+    def add_many(self, recipes):
+        """Ajoute plusieurs recettes"""
+        for recipe in recipes:
+            self.add(recipe)
+
+    def pantry_mask(self, pantry):
+        """Bitset des ingrédients couverts par le garde-manger
+
+        "chicken" couvre aussi "chicken breast" : un ingrédient est couvert
+        si tous les mots d'un élément du garde-manger y figurent.
+        """
+        mask = 0
+        with self._lock:
+            for item in pantry:
+                tokens = normalize_food(item).split()
+                if not tokens:
+                    continue
+                foods = -1
+                for token in tokens:
+                    foods &= self._token_foods.get(token, 0)
+                mask |= max(foods, 0)
+        return mask
+
+    def search(self, pantry, limit=50):
+        """Classe les recettes par couverture puis par nombre d'ingrédients manquants
+
+        Renvoie une liste de (recette, ingrédients couverts, ingrédients requis).
+        """
+        pantry_mask = self.pantry_mask(pantry)
+        if not pantry_mask:
+            return []
+
+        with self._lock:
+            # Recettes utilisant au moins un ingrédient du garde-manger
+            candidates = set()
+            for food_id in iter_bits(pantry_mask):
+                candidates.update(self._postings[food_id])
+
+            scored = []
+            masks = self._masks
+            counts = self._counts
+            for slot in candidates:
+                have = (masks[slot] & pantry_mask).bit_count()
+                total = counts[slot]
+                scored.append((-have / total, total - have, slot, have, total))
+
+            scored.sort()
+            return [(self.recipes[slot], have, total) for _, _, slot, have, total in scored[:limit]]
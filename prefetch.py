@@ -0,0 +1,110 @@
+import heapq
+import itertools
+import threading
+
+from metrics import metrics
+
+
+class PrefetchScheduler:
+    """Préchargements facultatifs par priorité, pendant les temps morts
+
+    Chaque tâche est (priorité, clé, fournisseur, start) : start() lance le
+    préchargement et renvoie un Future. Les plus petites priorités passent
+    d'abord et au plus max_running tâches tournent à la fois. pause() arrête
+    immédiatement de lancer de nouvelles tâches pour laisser la place au
+    travail demandé par l'utilisateur. Une tâche dont le fournisseur n'a
+    plus de marge de débit (has_capacity) est abandonnée.
+
+    used(clé, prête) indique, à l'affichage, si un préchargement a servi :
+    les résultats sont comptés dans le cache "prefetch.<sorte>" des mesures.
+    Les clés sont des tuples dont le premier élément est la sorte ("image").
+    """
+
+    def __init__(self, max_running=1, has_capacity=None, max_remembered=4096):
+        self.max_running = max_running
+        self.max_remembered = max_remembered
+        self.has_capacity = has_capacity
+        self._lock = threading.Lock()
+        self._queue = []
+        self._order = itertools.count()
+        self._running = {}
+        self._started = set()
+        self._paused = False
+        self.counts = {"started": 0, "skipped": 0, "instant": 0, "joined": 0}
+
+    def schedule(self, jobs):
+        """Remplace les tâches en attente par jobs : itérable de (priorité, clé, fournisseur, start)"""
+        with self._lock:
+            self._queue = [(priority, next(self._order), key, provider, start)
+                           for priority, key, provider, start in jobs
+                           if key not in self._started and key not in self._running]
+            heapq.heapify(self._queue)
+        self._pump()
+
+    def clear(self):
+        """Abandonne les tâches en attente"""
+        with self._lock:
+            self._queue = []
+
+    def pause(self):
+        """Suspend le lancement de nouvelles tâches (travail de l'utilisateur en cours)"""
+        self._paused = True
+
+    def resume(self):
+        """Reprend les préchargements"""
+        self._paused = False
+        self._pump()
+
+    def is_paused(self):
+        return self._paused
+
+    def _pump(self):
+        """Lance les tâches prioritaires tant que la limite et les quotas le permettent"""
+        while True:
+            with self._lock:
+                if self._paused or not self._queue or len(self._running) >= self.max_running:
+                    return
+                _, _, key, provider, start = heapq.heappop(self._queue)
+                if key in self._started or key in self._running:
+                    continue
+                if self.has_capacity is not None and not self.has_capacity(provider):
+                    self.counts["skipped"] += 1
+                    metrics.count("prefetch.skipped", kind=key[0], reason="rate_limit")
+                    continue
+                self._running[key] = None
+                self.counts["started"] += 1
+            metrics.count("prefetch.started", kind=key[0])
+            try:
+                future = start()
+            except Exception as e:
+                metrics.error("prefetch", e)
+                self._finished(key)
+                continue
+            future.add_done_callback(lambda future, key=key: self._finished(key))
+
+    def _finished(self, key):
+        with self._lock:
+            self._running.pop(key, None)
+            if len(self._started) >= self.max_remembered:
+                self._started.clear()
+            self._started.add(key)
+        self._pump()
+
+    def used(self, key, ready):
+        """Compte l'affichage d'une ressource : préchargée et prête (ready), en cours, ou non préchargée"""
+        with self._lock:
+            if key in self._started and ready:
+                result = "instant"
+            elif key in self._running:
+                result = "joined"
+            else:
+                result = "miss"
+            if result != "miss":
+                self.counts[result] += 1
+        metrics.cache(f"prefetch.{key[0]}", result)
+        return result
+
+    def stats(self):
+        """Compteurs : lancées, abandonnées (quota), affichages instantanés et en cours"""
+        with self._lock:
+            return dict(self.counts)
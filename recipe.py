@@ -0,0 +1,198 @@
+import re
+import sys
+from functools import lru_cache
+
+from shopping_list import UNITS
+
+# Quantité en tête d'une mesure libre ("1 1/2 cups", "400g", "½ tsp", "to taste")
+_MEASURE = re.compile(r"\s*((?:\d+(?:[.,/]\d+)?|[½¼¾⅓⅔⅛])(?:\s+\d+/\d+|\s*[½¼¾⅓⅔⅛])?)?\s*(.*?)\s*$", re.S)
+
+# Champs lourds absents des recettes partielles, rechargés à la demande
+DETAIL_FIELDS = ("ingredients", "instructions")
+
+
+# Séparateurs de pack_ingredients, remplacés dans les champs
+_SEPARATORS = str.maketrans("\t\n", "  ")
+
+# Ingrédients (quantité, unité, aliment) déjà rencontrés, partagés entre recettes
+_INGREDIENTS = {}
+MAX_SHARED_INGREDIENTS = 65536
+
+
+def intern(text):
+    """Chaîne partagée entre toutes les recettes (unités, aliments, quantités)"""
+    return sys.intern(text) if text else ""
+
+
+def ingredient(quantity, unit, food):
+    """Tuple (quantité, unité, aliment) partagé par toutes les recettes qui l'utilisent"""
+    key = (quantity, unit, food)
+    shared = _INGREDIENTS.get(key)
+    if shared is None:
+        if len(_INGREDIENTS) >= MAX_SHARED_INGREDIENTS:
+            _INGREDIENTS.clear()
+        shared = _INGREDIENTS[key] = (intern(quantity), intern(unit), intern(food))
+    return shared
+
+
+@lru_cache(maxsize=4096)
+def split_measure(measure):
+    """Sépare une mesure libre en (quantité, unité)"""
+    quantity, unit = _MEASURE.match(measure or "").groups()
+    return quantity or "", unit
+
+
+@lru_cache(maxsize=4096)
+def split_unit(text):
+    """Sépare une unité connue en tête du reste ("cups soy sauce" -> ("cups", "soy sauce"))"""
+    words = (text or "").split()
+    for size in (2, 1):
+        if len(words) > size and " ".join(words[:size]).lower().replace(".", "") in UNITS:
+            return " ".join(words[:size]), " ".join(words[size:])
+    return "", text or ""
+
+
+@lru_cache(maxsize=4096)
+def format_quantity(quantity):
+    """Quantité numérique Edamam en texte ("" si non précisée)"""
+    return f"{quantity:g}" if quantity else ""
+
+
+def ingredient_line(item):
+    """Ligne affichée d'un ingrédient (quantité, unité, aliment)"""
+    return " ".join(part for part in item if part)
+
+
+def pack_ingredients(ingredients):
+    """Ingrédients en texte pour SQLite : une ligne par ingrédient, champs séparés par des tabulations
+
+    Les tabulations et retours à la ligne d'un champ deviennent des espaces.
+    """
+    return "\n".join("\t".join(part.translate(_SEPARATORS) for part in item) for item in ingredients)
+
+
+def unpack_ingredients(text):
+    """Inverse de pack_ingredients"""
+    if not text:
+        return ()
+    return tuple(ingredient(*line.split("\t")) for line in text.split("\n"))
+
+
+def parse_lines(text, foods=()):
+    """Ingrédients structurés depuis l'ancien format : lignes "mesure aliment" et liste des aliments
+
+    Sans liste des aliments (favoris enregistrés avant elle), chaque ligne
+    est découpée seule : la quantité en tête, puis une unité connue (voir
+    shopping_list.UNITS), le reste comme aliment.
+    """
+    if not foods:
+        lines = (split_measure(line) for line in (text or "").split("\n"))
+        return tuple(ingredient(quantity, *split_unit(rest)) for quantity, rest in lines if quantity or rest)
+    ingredients = []
+    for line, food in zip((text or "").split("\n"), foods):
+        line = line.strip()
+        if line.endswith(food):
+            line = line[:len(line) - len(food)]
+        ingredients.append(ingredient(*split_measure(line), food.strip()))
+    return tuple(ingredients)
+
+
+class Recipe:
+    """Recette compacte : ingrédients structurés en tuples (quantité, unité, aliment)
+
+    Les quantités, unités et aliments sont des chaînes internées et chaque
+    tuple d'ingrédient est partagé par toutes les recettes chargées qui
+    l'utilisent (voir ingredient). Une recette partielle ("partial") n'a
+    ni ingrédients ni instructions tant que ChefCore.load_details ne l'a pas
+    complétée.
+    """
+
+    __slots__ = ("id", "title", "ingredients", "instructions", "image_url", "source", "partial", "pantry_match")
+
+    def __init__(self, id, title, ingredients=(), instructions="", image_url="", source="",
+                 partial=False, pantry_match=None):
+        self.id = id
+        self.title = title
+        self.ingredients = ingredients
+        self.instructions = instructions
+        self.image_url = image_url
+        self.source = source
+        self.partial = partial
+        self.pantry_match = pantry_match  # (ingrédients couverts, requis) pour le garde-manger
+
+    def __repr__(self):
+        return f"Recipe({self.source}:{self.id} {self.title!r})"
+
+    @property
+    def foods(self):
+        """Noms des aliments, dans l'ordre des ingrédients"""
+        return [food for _, _, food in self.ingredients]
+
+    def ingredient_lines(self):
+        """Lignes d'ingrédients à afficher ou traduire"""
+        return [ingredient_line(item) for item in self.ingredients]
+
+    @property
+    def ingredients_text(self):
+        return "\n".join(self.ingredient_lines())
+
+    def copy(self, **changes):
+        """Copie superficielle, avec des champs modifiés"""
+        recipe = Recipe(self.id, self.title, self.ingredients, self.instructions, self.image_url, self.source,
+                        self.partial, self.pantry_match)
+        for field, value in changes.items():
+            setattr(recipe, field, value)
+        return recipe
+
+    def summary(self):
+        """Copie partielle : de quoi afficher la recette dans une liste, sans ses détails"""
+        return Recipe(self.id, self.title, image_url=self.image_url, source=self.source, partial=True)
+
+    def strip_details(self):
+        """Retire les détails en gardant de quoi afficher la recette dans la liste"""
+        self.ingredients = ()
+        self.instructions = ""
+        self.partial = True
+
+    def fill_details(self, details):
+        """Reprend les détails d'une recette complète"""
+        for field in DETAIL_FIELDS:
+            setattr(self, field, getattr(details, field))
+        self.partial = False
+
+    def to_dict(self):
+        """Dictionnaire JSON : ingrédients en texte et en liste structurée"""
+        record = {
+            "id": self.id,
+            "title": self.title,
+            "ingredients": self.ingredients_text,
+            "items": [list(item) for item in self.ingredients],
+            "foods": self.foods,
+            "instructions": self.instructions,
+            "image_url": self.image_url,
+            "source": self.source,
+        }
+        if self.partial:
+            record["partial"] = True
+        if self.pantry_match is not None:
+            record["pantry_match"] = list(self.pantry_match)
+        return record
+
+    @classmethod
+    def from_dict(cls, record):
+        """Recette depuis to_dict, ou depuis un dictionnaire de l'ancien format"""
+        if "items" in record:
+            ingredients = tuple(ingredient(*item) for item in record["items"])
+        else:
+            ingredients = parse_lines(record.get("ingredients"), record.get("foods") or ())
+        pantry_match = record.get("pantry_match")
+        return cls(
+            record.get("id"),
+            record.get("title", ""),
+            ingredients,
+            record.get("instructions", ""),
+            record.get("image_url", ""),
+            record.get("source", ""),
+            bool(record.get("partial")),
+            tuple(pantry_match) if pantry_match else None,
+        )
@@ -0,0 +1,211 @@
+import hashlib
+import html
+import json
+import os
+import re
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import metrics
+
+# À changer quand le rendu des pages change : toutes les pages sont alors réécrites
+BOOK_VERSION = 1
+MANIFEST = "manifest.json"
+
+STYLE = """body { font-family: Helvetica, Arial, sans-serif; max-width: 46em; margin: 2em auto; padding: 0 1em; }
+img { max-width: 100%; border-radius: 6px; }
+ul.index { columns: 2; }
+.source { color: #777; font-size: 0.9em; }
+"""
+
+PAGE = """<!DOCTYPE html>
+<html lang="fr">
+<head><meta charset="utf-8"><title>{title}</title><link rel="stylesheet" href="../style.css"></head>
+<body>
+<p><a href="../index.html">&larr; Sommaire</a></p>
+<h1>{title}</h1>
+{image}
+<h2>Ingrédients</h2>
+<ul>
+{ingredients}
+</ul>
+<h2>Instructions</h2>
+{instructions}
+<p class="source">{source}</p>
+</body>
+</html>
+"""
+
+INDEX = """<!DOCTYPE html>
+<html lang="fr">
+<head><meta charset="utf-8"><title>Livre de recettes</title><link rel="stylesheet" href="style.css"></head>
+<body>
+<h1>Livre de recettes</h1>
+<ul class="index">
+{links}
+</ul>
+</body>
+</html>
+"""
+
+
+def recipe_digest(recipe):
+    """Empreinte du contenu d'une recette et de la version du rendu"""
+    raw = json.dumps([BOOK_VERSION, recipe.to_dict()], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def page_name(recipe):
+    """Nom de fichier stable d'une recette : titre lisible et empreinte de (source, id)"""
+    slug = re.sub(r"[^a-z0-9]+", "-", recipe.title.lower()).strip("-")[:60] or "recette"
+    key = hashlib.sha1(f"{recipe.source}:{recipe.id}".encode("utf-8")).hexdigest()[:8]
+    return f"{slug}-{key}.html"
+
+
+def render_page(recipe, image=None):
+    """Page HTML d'une recette ; image est le nom du fichier dans assets/"""
+    paragraphs = (line.strip() for line in (recipe.instructions or "").split("\n"))
+    return PAGE.format(
+        title=html.escape(recipe.title),
+        image=f'<img src="../assets/{image}" alt="">' if image else "",
+        ingredients="\n".join(f"<li>{html.escape(line)}</li>" for line in recipe.ingredient_lines()),
+        instructions="\n".join(f"<p>{html.escape(line)}</p>" for line in paragraphs if line),
+        source=html.escape(recipe.source or ""),
+    )
+
+
+def write_file(path, data):
+    """Écrit data (texte ou octets) de façon atomique"""
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data.encode("utf-8") if isinstance(data, str) else data)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class RecipeBook:
+    """Livre de recettes HTML statique, consultable hors ligne
+
+    out_dir contient index.html, une page par recette dans recipes/ et les
+    images dans assets/, nommées par l'empreinte de leur contenu : une image
+    partagée n'est stockée qu'une fois. Les miniatures viennent du cache
+    d'images (image_cache.file), téléchargées seulement si absentes.
+
+    Un manifeste garde l'empreinte de chaque recette exportée : une nouvelle
+    exportation ne réécrit que les recettes modifiées et supprime les pages
+    et images qui ne servent plus. Les recettes sont traitées en parallèle
+    avec au plus 2 * max_workers en cours : la mémoire reste constante quel
+    que soit leur nombre.
+    """
+
+    def __init__(self, out_dir, image_cache=None, fetch=None, max_workers=4):
+        self.out_dir = out_dir
+        self.image_cache = image_cache
+        self.fetch = fetch
+        self.max_workers = max_workers
+        self.pages_dir = os.path.join(out_dir, "recipes")
+        self.assets_dir = os.path.join(out_dir, "assets")
+
+    def _load_manifest(self):
+        try:
+            with open(os.path.join(self.out_dir, MANIFEST), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _asset(self, url):
+        """Copie la miniature de url dans assets/ ; renvoie son nom de fichier"""
+        path = self.image_cache.file(url, self.fetch)
+        with open(path, "rb") as f:
+            data = f.read()
+        name = f"{hashlib.sha256(data).hexdigest()[:32]}.jpg"
+        target = os.path.join(self.assets_dir, name)
+        if not os.path.exists(target):
+            write_file(target, data)
+        return name
+
+    def _export_one(self, recipe, previous):
+        """Écrit la page d'une recette si elle a changé ; renvoie (entrée du manifeste, écrite)"""
+        digest = recipe_digest(recipe)
+        page = page_name(recipe)
+        image = previous.get("image") if previous else None
+        if previous and previous.get("digest") == digest and previous.get("page") == page \
+                and os.path.exists(os.path.join(self.pages_dir, page)) \
+                and (image is None or os.path.exists(os.path.join(self.assets_dir, image))):
+            return previous, False
+
+        image = None
+        if recipe.image_url and self.image_cache is not None:
+            try:
+                with metrics.span("book.image"):
+                    image = self._asset(recipe.image_url)
+            except Exception as e:
+                metrics.error("book.image", e)
+                digest = None  # image réessayée à la prochaine exportation
+        with metrics.span("book.page"):
+            write_file(os.path.join(self.pages_dir, page), render_page(recipe, image))
+        return {"title": recipe.title, "page": page, "image": image, "digest": digest}, True
+
+    def export(self, recipes, progress=None, keep=None):
+        """Exporte des recettes complètes (itérable, lu au fur et à mesure) ; renvoie des compteurs
+
+        Sans keep, le livre ne contient plus que recipes. Avec keep, l'export
+        est partiel : une recette déjà exportée mais absente de recipes reste
+        dans le livre si keep("source:id") est vrai. progress(recettes
+        traitées) est appelé après chaque recette.
+        """
+        os.makedirs(self.pages_dir, exist_ok=True)
+        os.makedirs(self.assets_dir, exist_ok=True)
+        previous = self._load_manifest()
+        manifest = {}
+        counts = {"written": 0, "unchanged": 0, "removed": 0}
+
+        def collect(key, future):
+            entry, written = future.result()
+            manifest[key] = entry
+            counts["written" if written else "unchanged"] += 1
+            metrics.count("book.recipes", result="written" if written else "unchanged")
+            if progress is not None:
+                progress(len(manifest))
+
+        with metrics.span("book.export"), ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            pending = deque()
+            for recipe in recipes:
+                key = f"{recipe.source}:{recipe.id}"
+                pending.append((key, pool.submit(self._export_one, recipe, previous.get(key))))
+                if len(pending) >= 2 * self.max_workers:
+                    collect(*pending.popleft())
+            while pending:
+                collect(*pending.popleft())
+            if keep is not None:
+                manifest.update((key, entry) for key, entry in previous.items()
+                                if key not in manifest and keep(key))
+
+            # Pages et images qui ne servent plus
+            pages = {entry["page"] for entry in manifest.values()}
+            for entry in previous.values():
+                if entry.get("page") not in pages:
+                    self._remove(os.path.join(self.pages_dir, entry.get("page") or ""))
+                    counts["removed"] += 1
+            images = {entry["image"] for entry in manifest.values() if entry["image"]}
+            for name in os.listdir(self.assets_dir):
+                if name not in images:
+                    self._remove(os.path.join(self.assets_dir, name))
+
+            links = sorted((entry["title"].lower(), entry["title"], entry["page"]) for entry in manifest.values())
+            write_file(os.path.join(self.out_dir, "style.css"), STYLE)
+            write_file(os.path.join(self.out_dir, "index.html"), INDEX.format(links="\n".join(
+                f'<li><a href="recipes/{html.escape(page)}">{html.escape(title)}</a></li>'
+                for _, title, page in links
+            )))
+            write_file(os.path.join(self.out_dir, MANIFEST), json.dumps(manifest, ensure_ascii=False))
+        return counts
+
+    @staticmethod
+    def _remove(path):
+        if os.path.isfile(path):
+            os.remove(path)
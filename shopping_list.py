@@ -0,0 +1,149 @@
+import re
+import sys
+from functools import lru_cache
+
+from pantry_index import normalize_food
+
+_FRACTIONS = {"½": 0.5, "¼": 0.25, "¾": 0.75, "⅓": 1 / 3, "⅔": 2 / 3, "⅛": 0.125}
+_QUANTITY_PART = re.compile(r"(\d+(?:[.,]\d+)?)?\s*(?:/\s*(\d+))?\s*([½¼¾⅓⅔⅛])?")
+
+# Unités reconnues : alias -> (unité de base, facteur vers l'unité de base)
+_MASS = {"g": 1, "gr": 1, "gram": 1, "grams": 1, "gramme": 1, "grammes": 1,
+         "kg": 1000, "kgs": 1000, "kilo": 1000, "kilos": 1000, "kilogram": 1000, "kilograms": 1000,
+         "mg": 0.001, "oz": 28.35, "ounce": 28.35, "ounces": 28.35,
+         "lb": 453.6, "lbs": 453.6, "pound": 453.6, "pounds": 453.6}
+_VOLUME = {"ml": 1, "millilitre": 1, "millilitres": 1, "milliliter": 1, "milliliters": 1,
+           "cl": 10, "dl": 100, "l": 1000, "litre": 1000, "litres": 1000, "liter": 1000, "liters": 1000,
+           "tsp": 5, "tsps": 5, "teaspoon": 5, "teaspoons": 5,
+           "tbsp": 15, "tbsps": 15, "tbs": 15, "tbls": 15, "tblsp": 15, "tablespoon": 15, "tablespoons": 15,
+           "cup": 240, "cups": 240, "pint": 473, "pints": 473, "pt": 473,
+           "quart": 946, "quarts": 946, "qt": 946, "gallon": 3785, "gallons": 3785,
+           "fl oz": 29.57, "fluid ounce": 29.57, "fluid ounces": 29.57}
+_COUNT = {"clove": "clove", "cloves": "clove", "slice": "slice", "slices": "slice",
+          "can": "can", "cans": "can", "tin": "can", "tins": "can",
+          "pinch": "pinch", "pinches": "pinch", "dash": "dash", "dashes": "dash",
+          "handful": "handful", "handfuls": "handful", "bunch": "bunch", "bunches": "bunch",
+          "sprig": "sprig", "sprigs": "sprig", "stick": "stick", "sticks": "stick",
+          # Simples comptes : "2 large" (œufs), "<unit>" d'Edamam
+          "": "", "<unit>": "", "whole": "", "large": "", "medium": "", "small": "",
+          "piece": "", "pieces": "", "serving": "", "servings": ""}
+
+UNITS = {alias: ("g", factor) for alias, factor in _MASS.items()}
+UNITS.update((alias, ("ml", factor)) for alias, factor in _VOLUME.items())
+UNITS.update((alias, (unit, 1)) for alias, unit in _COUNT.items())
+
+
+@lru_cache(maxsize=4096)
+def parse_quantity(text):
+    """Quantité en nombre ("1 1/2", "½", "1,5", "2.5") ; None si absente ou illisible"""
+    total = None
+    for part in (text or "").split():
+        match = _QUANTITY_PART.fullmatch(part)
+        if not match or not any(match.groups()):
+            return None
+        number, denominator, fraction = match.groups()
+        value = float(number.replace(",", ".")) if number else 0.0
+        if denominator:
+            if not number or float(denominator) == 0:
+                return None
+            value /= float(denominator)
+        if fraction:
+            value += _FRACTIONS[fraction]
+        total = (total or 0.0) + value
+    return total
+
+
+@lru_cache(maxsize=1024)
+def parse_unit(text):
+    """Unité de base et facteur d'une unité libre ("cups chopped" -> ("ml", 240))
+
+    Les mots qui suivent une unité reconnue sont ignorés ; une unité inconnue
+    est gardée telle quelle, sans conversion.
+    """
+    text = (text or "").lower().replace(".", "").strip()
+    words = text.split()
+    for candidate in (text, " ".join(words[:2]), words[0] if words else ""):
+        if candidate in UNITS:
+            return UNITS[candidate]
+    return sys.intern(text), 1
+
+
+@lru_cache(maxsize=16384)
+def normalize_ingredient(item):
+    """Ingrédient (quantité, unité, aliment) normalisé en (quantité, unité de base, clé d'aliment)
+
+    La quantité est convertie dans l'unité de base (g, ml ou unité comptée),
+    None si elle n'est pas précisée ("to taste"). La clé d'aliment est
+    internée. Les tuples d'ingrédients étant partagés (voir
+    recipe.ingredient), le cache sert pour toutes les recettes qui les
+    utilisent.
+    """
+    quantity, unit, food = item
+    base_unit, factor = parse_unit(unit)
+    amount = parse_quantity(quantity)
+    return (amount * factor if amount is not None else None), base_unit, sys.intern(normalize_food(food))
+
+
+def format_amount(amount, unit):
+    """Quantité lisible : kg et l au-delà de 1000 g ou 1000 ml"""
+    if amount is None:
+        return ""
+    if unit in ("g", "ml") and amount >= 1000:
+        amount, unit = amount / 1000, "kg" if unit == "g" else "l"
+    return " ".join(part for part in (f"{round(amount, 2):g}", unit) if part)
+
+
+class ShoppingItem:
+    """Ligne de liste de courses : un aliment dans une unité de base"""
+
+    __slots__ = ("food", "key", "unit", "amount", "recipes", "unquantified")
+
+    def __init__(self, food, key, unit):
+        self.food = food
+        self.key = key
+        self.unit = unit
+        self.amount = None
+        self.recipes = set()
+        self.unquantified = 0  # usages sans quantité ("to taste")
+
+    def __repr__(self):
+        return f"ShoppingItem({self.line()!r})"
+
+    def line(self):
+        """Ligne affichée : quantité totale et aliment"""
+        if self.amount is None:
+            return f"{self.food} ({self.unit})" if self.unit else self.food
+        return " ".join(part for part in (format_amount(self.amount, self.unit), self.food) if part)
+
+    def to_dict(self):
+        return {
+            "food": self.food,
+            "amount": self.amount,
+            "unit": self.unit,
+            "line": self.line(),
+            "recipes": len(self.recipes),
+        }
+
+
+def build_shopping_list(recipes):
+    """Additionne les ingrédients de plusieurs recettes complètes ; renvoie des ShoppingItem triés
+
+    Les quantités d'un même aliment sont additionnées dans son unité de
+    base ; masse, volume et unités comptées restent sur des lignes
+    distinctes, faute de densité connue.
+    """
+    items = {}
+    for recipe in recipes:
+        for ingredient in recipe.ingredients:
+            amount, unit, key = normalize_ingredient(ingredient)
+            if not key:
+                continue
+            item = items.get((key, unit))
+            if item is None:
+                item = items[key, unit] = ShoppingItem(ingredient[2], key, unit)
+            if amount is None:
+                item.unquantified += 1
+            else:
+                item.amount = (item.amount or 0.0) + amount
+            item.recipes.add(recipe.id)
+    return sorted(items.values(), key=lambda item: (item.key, item.unit))
@@ -0,0 +1,107 @@
+import heapq
+import math
+import threading
+
+from pantry_index import normalize_food
+
+
+def recipe_terms(recipe):
+    """Termes d'une recette : mots des noms d'ingrédients normalisés"""
+    terms = set()
+    for _, _, food in recipe.ingredients:
+        terms.update(normalize_food(food).split())
+    return terms
+
+
+class SimilarIndex:
+    """Recettes proches par similarité cosinus de vecteurs TF-IDF d'ingrédients
+
+    Les vecteurs sont creux et binaires (un ingrédient est présent ou non) :
+    chaque terme pointe vers les recettes qui l'utilisent et le produit
+    scalaire ne parcourt que les recettes partageant un terme avec la
+    requête. L'ajout d'une recette est incrémental ; les IDF sont figés
+    et les normes recalculées quand le nombre de recettes a augmenté de
+    plus de refresh_ratio depuis le dernier calcul. Normes et produits
+    scalaires utilisent les mêmes IDF : un score ne dépasse jamais 1. L'index
+    garde un résumé de chaque recette (Recipe.summary), pas la recette.
+    """
+
+    def __init__(self, refresh_ratio=0.1):
+        self._lock = threading.Lock()
+        self.refresh_ratio = refresh_ratio
+        self.recipes = []
+        self._slots = {}
+        self._terms = []
+        self._norms = []
+        self._postings = {}
+        self._normed_count = 0
+        self._idfs = {}  # IDF figés au dernier recalcul des normes
+        self._new_idf = 1.0  # IDF d'un terme apparu depuis
+
+    def __len__(self):
+        return len(self.recipes)
+
+    def _idf(self, term):
+        """IDF figé au dernier recalcul des normes"""
+        return self._idfs.get(term, self._new_idf)
+
+    def _current_idf(self, count):
+        """IDF lissé d'un terme présent dans count recettes : les rares pèsent plus, aucun ne pèse zéro"""
+        return math.log((1 + len(self.recipes)) / (1 + count)) + 1
+
+    def _norm(self, terms):
+        return math.sqrt(sum(self._idf(term) ** 2 for term in terms))
+
+    def add(self, recipe):
+        """Ajoute une recette (Recipe), ignorée si déjà indexée ou sans ingrédients"""
+        key = (recipe.source, recipe.id)
+        terms = recipe_terms(recipe)
+        with self._lock:
+            if key in self._slots or not terms:
+                return
+            slot = len(self.recipes)
+            self._slots[key] = slot
+            self.recipes.append(recipe.summary())
+            self._terms.append(tuple(terms))
+            for term in terms:
+                self._postings.setdefault(term, []).append(slot)
+            self._norms.append(self._norm(terms))
+
+    def add_many(self, recipes):
+        """Ajoute plusieurs recettes"""
+        for recipe in recipes:
+            self.add(recipe)
+        with self._lock:
+            self._refresh_norms()
+
+    def _refresh_norms(self):
+        if len(self.recipes) > self._normed_count * (1 + self.refresh_ratio):
+            self._idfs = {term: self._current_idf(len(slots)) for term, slots in self._postings.items()}
+            self._new_idf = self._current_idf(0)
+            self._norms = [self._norm(terms) for terms in self._terms]
+            self._normed_count = len(self.recipes)
+
+    def similar(self, recipe, limit=10):
+        """Recettes les plus proches de recipe ; renvoie une liste de (recette, score)"""
+        terms = recipe_terms(recipe)
+        if not terms:
+            return []
+        key = (recipe.source, recipe.id)
+
+        with self._lock:
+            self._refresh_norms()
+            weights = {term: self._idf(term) for term in terms}
+            query_norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+
+            # Produit scalaire creux, terme par terme
+            scores = {}
+            for term, weight in weights.items():
+                weight *= weight
+                for slot in self._postings.get(term, ()):
+                    scores[slot] = scores.get(slot, 0.0) + weight
+            scores.pop(self._slots.get(key), None)
+
+            norms = self._norms
+            best = heapq.nlargest(limit, ((score / (norms[slot] * query_norm), slot)
+                                          for slot, score in scores.items()))
+            return [(self.recipes[slot], score) for score, slot in best]
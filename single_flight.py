@@ -0,0 +1,112 @@
+import threading
+from concurrent.futures import Future, InvalidStateError
+
+from metrics import metrics
+
+
+class _Flight:
+    """Calcul en cours et appelants qui l'attendent"""
+
+    def __init__(self, future):
+        self.future = future
+        self.waiters = set()
+
+
+class SingleFlight:
+    """Regroupe les demandes identiques simultanées sur un seul calcul
+
+    Une demande est identifiée par (sorte, clé normalisée). Tant qu'un calcul
+    est en cours pour cette clé, les nouvelles demandes en partagent le
+    résultat au lieu d'en lancer un autre.
+
+    submit() confie le calcul à un exécuteur et renvoie à chaque appelant son
+    propre Future : l'annuler ne concerne que cet appelant, et le calcul
+    lui-même n'est annulé que si plus personne ne l'attend et qu'il n'a pas
+    commencé. do() calcule dans le thread appelant, ou attend le calcul déjà
+    en cours.
+    """
+
+    def __init__(self, executor=None):
+        self.executor = executor
+        self._lock = threading.RLock()  # annuler un calcul rappelle _on_flight_done
+        self._flights = {}
+
+    def in_flight(self):
+        """Nombre de calculs en cours"""
+        with self._lock:
+            return len(self._flights)
+
+    def submit(self, kind, key, function, *args, executor=None):
+        """Lance function(*args) sur l'exécuteur, ou rejoint le calcul en cours ; renvoie un Future"""
+        flight_key = (kind, key)
+        waiter = Future()
+        with self._lock:
+            flight = self._flights.get(flight_key)
+            created = flight is None
+            if created:
+                flight = self._flights[flight_key] = _Flight((executor or self.executor).submit(function, *args))
+            flight.waiters.add(waiter)
+        metrics.count("single_flight", kind=kind, result="new" if created else "shared")
+
+        waiter.add_done_callback(lambda waiter: self._on_waiter_done(flight_key, flight, waiter))
+        if created:
+            flight.future.add_done_callback(lambda future: self._on_flight_done(flight_key, flight))
+        return waiter
+
+    def do(self, kind, key, function, *args):
+        """Calcule function(*args) dans le thread appelant, ou attend le calcul identique en cours"""
+        flight_key = (kind, key)
+        with self._lock:
+            flight = self._flights.get(flight_key)
+            created = flight is None
+            if created:
+                flight = self._flights[flight_key] = _Flight(Future())
+        metrics.count("single_flight", kind=kind, result="new" if created else "shared")
+        if not created:
+            return flight.future.result()
+
+        flight.future.add_done_callback(lambda future: self._on_flight_done(flight_key, flight))
+        flight.future.set_running_or_notify_cancel()
+        try:
+            result = function(*args)
+        except BaseException as e:
+            flight.future.set_exception(e)
+            raise
+        flight.future.set_result(result)
+        return result
+
+    def _forget(self, flight_key, flight):
+        with self._lock:
+            if self._flights.get(flight_key) is flight:
+                del self._flights[flight_key]
+
+    def _on_flight_done(self, flight_key, flight):
+        """Transmet le résultat aux appelants encore en attente"""
+        self._forget(flight_key, flight)
+        with self._lock:
+            waiters = list(flight.waiters)
+            flight.waiters.clear()
+        future = flight.future
+        for waiter in waiters:
+            try:
+                if future.cancelled():
+                    waiter.cancel()
+                elif future.exception() is not None:
+                    waiter.set_exception(future.exception())
+                else:
+                    waiter.set_result(future.result())
+            except InvalidStateError:
+                pass  # appelant annulé entre-temps
+
+    def _on_waiter_done(self, flight_key, flight, waiter):
+        """Un appelant annulé abandonne le calcul s'il était le dernier à l'attendre"""
+        if not waiter.cancelled():
+            return
+        with self._lock:
+            flight.waiters.discard(waiter)
+            if flight.waiters or flight.future.done():
+                return
+            # Un calcul déjà commencé continue : une nouvelle demande pourra le rejoindre
+            cancelled = flight.future.cancel()
+        if cancelled:
+            metrics.count("single_flight.cancelled", kind=flight_key[0])
@@ -0,0 +1,101 @@
+import json
+import sqlite3
+
+from favorites_store import MIGRATIONS, FavoritesStore
+from recipe import Recipe
+from shopping_list import build_shopping_list
+
+
+def create_baseline_db(path, rows):
+    """Base des favoris telle que l'écrivait la version d'origine (sans foods ni items)"""
+    conn = sqlite3.connect(path)
+    conn.execute('''CREATE TABLE favorites
+                    (id TEXT PRIMARY KEY,
+                     title TEXT,
+                     ingredients TEXT,
+                     instructions TEXT,
+                     image_url TEXT,
+                     source TEXT)''')
+    conn.executemany("INSERT INTO favorites VALUES (?, ?, ?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+
+def test_baseline_ingredients_survive_migration(tmp_path):
+    path = str(tmp_path / "favorites.db")
+    create_baseline_db(path, [
+        ("52772", "Teriyaki Chicken", "3/4 cup soy sauce\n1 1/2 cups chicken\npinch salt", "Cook.", "", "themealdb"),
+    ])
+
+    store = FavoritesStore(path)
+    recipe = store.get("52772")
+    assert recipe.ingredients == (("3/4", "cup", "soy sauce"), ("1 1/2", "cups", "chicken"),
+                                  ("", "pinch", "salt"))
+    assert recipe.ingredient_lines() == ["3/4 cup soy sauce", "1 1/2 cups chicken", "pinch salt"]
+    assert [r.id for r in store.search("chicken")] == ["52772"]
+    store.close()
+
+
+def test_from_dict_without_foods():
+    recipe = Recipe.from_dict({"id": "1", "title": "Soup", "ingredients": "2 carrots\n1 l water"})
+    assert recipe.ingredients == (("2", "", "carrots"), ("1", "l", "water"))
+
+
+def test_legacy_units_merge_in_shopping_list():
+    legacy = Recipe.from_dict({"id": "1", "title": "Noodles", "ingredients": "1 cup soy sauce\n2 large eggs"})
+    structured = Recipe("2", "Rice", (("2", "tbsp", "soy sauce"),))
+    assert legacy.ingredients == (("1", "cup", "soy sauce"), ("2", "large", "eggs"))
+    assert [item.line() for item in build_shopping_list([legacy, structured])] == ["2 eggs", "270 ml soy sauce"]
+
+
+def test_migrates_pre_pantry_schema(tmp_path):
+    """Base d'avant la colonne foods : table d'origine, index FTS et triggers par id"""
+    path = str(tmp_path / "favorites.db")
+    create_baseline_db(path, [("1", "Pancakes", "2 eggs\n250 ml milk", "Mix.", "", "themealdb")])
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE VIRTUAL TABLE favorites_fts USING fts5(id UNINDEXED, title, ingredients, instructions,
+                                                      tokenize = 'unicode61 remove_diacritics 2');
+        CREATE TRIGGER favorites_ai AFTER INSERT ON favorites BEGIN
+            INSERT INTO favorites_fts (id, title, ingredients, instructions)
+            VALUES (new.id, new.title, new.ingredients, new.instructions);
+        END;
+        INSERT INTO favorites_fts (favorites_fts, rank) VALUES ('rank', 'bm25(0.0, 10.0, 3.0, 1.0)');
+        INSERT INTO favorites_fts (id, title, ingredients, instructions)
+            SELECT id, title, ingredients, instructions FROM favorites;
+    ''')
+    conn.close()
+
+    store = FavoritesStore(path)
+    assert store._conn.execute("PRAGMA user_version").fetchone()[0] == len(MIGRATIONS)
+    assert store.get("1").ingredients == (("2", "", "eggs"), ("250", "ml", "milk"))
+    assert [r.id for r in store.search("milk")] == ["1"]
+    store.save(Recipe("2", "Crepes", (("1", "", "egg"),), "Mix."))
+    assert [r.id for r in store.search("crepes")] == ["2"]
+    store.close()
+
+
+def test_separators_inside_ingredient_fields(tmp_path):
+    store = FavoritesStore(str(tmp_path / "favorites.db"))
+    record = {"id": "1", "title": "Latte", "items": [["1", "cup", "milk\nor cream"], ["", "", "a\tb"]]}
+    assert store.import_jsonl([json.dumps(record)]) == 1
+    assert store.get("1").ingredients == (("1", "cup", "milk or cream"), ("", "", "a b"))
+    assert len(store.load_all()) == 1
+    store.close()
+
+
+def test_search_survives_vacuum(tmp_path):
+    """VACUUM ne renumérote pas les favoris : l'index plein texte reste aligné"""
+    store = FavoritesStore(str(tmp_path / "favorites.db"))
+    # Seule une clé INTEGER PRIMARY KEY garantit un rowid stable après VACUUM
+    columns = store._conn.execute("PRAGMA table_info(favorites)").fetchall()
+    assert [(name, kind) for _, name, kind, _, _, pk in columns if pk] == [("num", "INTEGER")]
+    store.save_many([Recipe(str(n), f"Dish {n}", (("1", "", f"food{n}"),), "Cook.") for n in range(5)])
+    store._conn.executemany("DELETE FROM favorites WHERE id = ?", [("0",), ("2",)])
+    store._conn.commit()
+    store._conn.execute("VACUUM")
+    assert [r.id for r in store.search("food3")] == ["3"]
+    store.save_many([Recipe("3", "Dish 3", (("1", "", "carrot"),), "Cook.")])
+    assert [r.id for r in store.search("carrot")] == ["3"]
+    assert store.search("food3") == []
+    store.close()
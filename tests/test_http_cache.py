@@ -0,0 +1,37 @@
+import pytest
+import requests
+
+from http_cache import HttpCache
+
+
+def test_key_normalizes_query_text_only():
+    assert HttpCache.make_key("edamam", "u", {"q": " Chicken  Curry"}) == \
+        HttpCache.make_key("edamam", "u", {"q": "chicken curry", "app_key": "secret"})
+    assert HttpCache.make_key("edamam", "u", {"q": "curry", "_cont": "CQ AbC"}) != \
+        HttpCache.make_key("edamam", "u", {"q": "curry", "_cont": "cq abc"})
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=""):
+        self.status_code = status_code
+        self.text = body
+        self.headers = {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} error", response=self)
+
+
+def test_quota_serves_stale_and_client_errors_raise(tmp_path):
+    cache = HttpCache(str(tmp_path / "cache.db"), ttls={"edamam": 0})
+    params = {"q": "curry"}
+    fresh = cache.get_json("edamam", "u", params, fetch=lambda *a, **k: FakeResponse(200, '{"hits": [1]}'))
+    assert fresh == {"hits": [1]}
+
+    quota = FakeResponse(429, '{"error": "quota"}')
+    assert cache.get_json("edamam", "u", params, fetch=lambda *a, **k: quota) == {"hits": [1]}
+
+    with pytest.raises(requests.HTTPError):
+        cache.get_json("edamam", "u", params, fetch=lambda *a, **k: FakeResponse(401, '{"error": "auth"}'))
+    with pytest.raises(requests.HTTPError):
+        cache.get_json("edamam", "u", {"q": "new"}, fetch=lambda *a, **k: quota)
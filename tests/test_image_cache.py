@@ -0,0 +1,34 @@
+from io import BytesIO
+
+from PIL import Image
+
+from image_cache import THUMBNAIL_SIZE, decode_thumbnail
+
+
+def encode(size, image_format):
+    stream = BytesIO()
+    Image.new("RGB", size, (200, 120, 40)).save(stream, image_format)
+    stream.seek(0)
+    return stream
+
+
+def test_jpeg_is_decoded_at_reduced_scale(monkeypatch):
+    decoded = []
+    thumbnail = Image.Image.thumbnail
+
+    def recording_thumbnail(img, size, *args, **kwargs):
+        decoded.append(img.size)
+        return thumbnail(img, size, *args, **kwargs)
+
+    monkeypatch.setattr(Image.Image, "thumbnail", recording_thumbnail)
+
+    img = decode_thumbnail(encode((4000, 3000), "JPEG"))
+    assert img.width <= THUMBNAIL_SIZE[0] and img.height <= THUMBNAIL_SIZE[1]
+    assert img.mode == "RGB"
+    # Mode draft : jamais décodée en pleine résolution, au plus deux fois la taille demandée
+    assert all(width <= 2 * THUMBNAIL_SIZE[0] and height <= 2 * THUMBNAIL_SIZE[1] for width, height in decoded)
+
+
+def test_other_formats_are_reduced():
+    img = decode_thumbnail(encode((1200, 800), "PNG"))
+    assert img.size == (350, 233)
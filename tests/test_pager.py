@@ -0,0 +1,38 @@
+from pager import Pager
+from pantry_index import PantryIndex
+from recipe import Recipe, ingredient
+from similar_index import SimilarIndex
+from title_index import TitleIndex
+
+
+def make_recipe(number):
+    return Recipe(f"r{number}", f"Chicken curry {number}",
+                  (ingredient("1", "cup", "rice"), ingredient("2", "", "chicken breasts")),
+                  "Cook.", source="edamam")
+
+
+def test_eviction_does_not_strip_index_entries():
+    recipes = [make_recipe(number) for number in range(6)]
+    pages = iter([(recipes[:3], "next"), (recipes[3:], None)])
+    pager = Pager(lambda cursor: next(pages), keep_pages=0)
+    similar, pantry, titles = SimilarIndex(), PantryIndex(), TitleIndex()
+    for index in (similar, pantry, titles):
+        index.add_many(recipes)
+    pager.fetch_next()
+    pager.fetch_next()
+
+    pager.evict_far(1)
+    assert recipes[0].partial and not recipes[0].ingredients
+    assert not recipes[3].partial
+
+    assert len(similar.similar(make_recipe(99))) == 6
+    assert len(pantry.search(["chicken"])) == 6
+    assert titles.search("chicken curry 0")[0].id == "r0"
+
+
+def test_indexes_keep_summaries_only():
+    recipes = [make_recipe(number) for number in range(3)]
+    for index in (SimilarIndex(), PantryIndex(), TitleIndex()):
+        index.add_many(recipes)
+        assert all(kept is not recipe for kept, recipe in zip(index.recipes, recipes))
+        assert all(kept.partial and not kept.ingredients and not kept.instructions for kept in index.recipes)
@@ -0,0 +1,50 @@
+import json
+import os
+
+from recipe import Recipe, ingredient
+from recipe_book import MANIFEST, RecipeBook
+
+
+def make_recipe(number, instructions="Cook."):
+    return Recipe(str(number), f"Soup {number}", (ingredient("1", "l", "water"),), instructions, source="themealdb")
+
+
+def manifest(out_dir):
+    with open(os.path.join(out_dir, MANIFEST), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_partial_export_keeps_untouched_recipes(tmp_path):
+    out_dir = str(tmp_path / "book")
+    book = RecipeBook(out_dir)
+    book.export([make_recipe(n) for n in range(3)])
+    pages = {key: entry["page"] for key, entry in manifest(out_dir).items()}
+
+    counts = book.export([make_recipe(1, "Simmer.")], keep=lambda key: True)
+    assert counts == {"written": 1, "unchanged": 0, "removed": 0}
+    assert set(manifest(out_dir)) == set(pages)
+    assert all(os.path.exists(os.path.join(out_dir, "recipes", page)) for page in pages.values())
+    with open(os.path.join(out_dir, "index.html"), encoding="utf-8") as f:
+        index = f.read()
+    assert all(page in index for page in pages.values())
+
+
+def test_partial_export_prunes_recipes_no_longer_kept(tmp_path):
+    out_dir = str(tmp_path / "book")
+    book = RecipeBook(out_dir)
+    book.export([make_recipe(n) for n in range(3)])
+    removed_page = manifest(out_dir)["themealdb:2"]["page"]
+
+    counts = book.export([make_recipe(0)], keep=lambda key: key != "themealdb:2")
+    assert counts["removed"] == 1
+    assert set(manifest(out_dir)) == {"themealdb:0", "themealdb:1"}
+    assert not os.path.exists(os.path.join(out_dir, "recipes", removed_page))
+
+
+def test_full_export_replaces_book(tmp_path):
+    out_dir = str(tmp_path / "book")
+    book = RecipeBook(out_dir)
+    book.export([make_recipe(n) for n in range(3)])
+    book.export([make_recipe(0)])
+    assert set(manifest(out_dir)) == {"themealdb:0"}
+    assert os.listdir(os.path.join(out_dir, "recipes")) == [manifest(out_dir)["themealdb:0"]["page"]]
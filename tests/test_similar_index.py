@@ -0,0 +1,19 @@
+from recipe import Recipe, ingredient
+from similar_index import SimilarIndex
+
+
+def make_recipe(number, *foods):
+    return Recipe(str(number), f"Dish {number}", tuple(ingredient("1", "", food) for food in foods))
+
+
+def test_scores_stay_within_one_between_refreshes():
+    index = SimilarIndex(refresh_ratio=10)
+    index.add_many([make_recipe(n, "rice", f"spice{n}") for n in range(20)])
+    index.add(make_recipe("x", "rice", "chicken"))
+    # Ajouts sans recalcul des normes : le riz devient relativement plus rare
+    for n in range(21, 120):
+        index.add(make_recipe(n, "beef", f"herb{n}"))
+
+    scores = [score for _, score in index.similar(make_recipe("q", "rice", "chicken"), limit=200)]
+    assert scores and max(scores) <= 1.0 + 1e-9
+    assert abs(scores[0] - 1.0) < 1e-9
@@ -0,0 +1,82 @@
+import heapq
+import re
+import threading
+import unicodedata
+
+
+def title_words(text):
+    """Mots d'un titre : minuscules, sans accents ni ponctuation"""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def trigrams(words):
+    """Trigrammes des mots, bordés d'espaces : "pie" donne " pi", "pie", "ie " """
+    grams = set()
+    for word in words:
+        padded = f" {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TitleIndex:
+    """Index de trigrammes des titres de recettes, pour des suggestions tolérantes aux fautes
+
+    Une requête est comparée aux titres par la part de ses trigrammes qu'ils
+    contiennent, puis par le coefficient de Dice pour départager : une
+    saisie partielle ("spag") ou fautive ("spagheti") retrouve
+    "Spaghetti Bolognese". Chaque titre normalisé n'est suggéré qu'une fois.
+    L'index garde un résumé de chaque recette (Recipe.summary).
+    """
+
+    def __init__(self, min_score=0.5):
+        self._lock = threading.Lock()
+        self.min_score = min_score
+        self.recipes = []
+        self._slots = {}
+        self._sizes = []
+        self._postings = {}
+
+    def __len__(self):
+        return len(self.recipes)
+
+    def add(self, recipe):
+        """Ajoute une recette (Recipe), ignorée si déjà indexée ou de même titre normalisé"""
+        words = title_words(recipe.title)
+        key = " ".join(words)
+        grams = trigrams(words)
+        with self._lock:
+            if key in self._slots or not grams:
+                return
+            slot = len(self.recipes)
+            self._slots[key] = slot
+            self.recipes.append(recipe.summary())
+            self._sizes.append(len(grams))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(slot)
+
+    def add_many(self, recipes):
+        """Ajoute plusieurs recettes"""
+        for recipe in recipes:
+            self.add(recipe)
+
+    def search(self, query, limit=10):
+        """Recettes dont le titre ressemble à la requête, les plus proches d'abord"""
+        grams = trigrams(title_words(query))
+        if not grams:
+            return []
+
+        with self._lock:
+            shared = {}
+            for gram in grams:
+                for slot in self._postings.get(gram, ()):
+                    shared[slot] = shared.get(slot, 0) + 1
+
+            sizes = self._sizes
+            needed = self.min_score * len(grams)
+            best = heapq.nlargest(limit, (
+                (count / len(grams), 2 * count / (len(grams) + sizes[slot]), -slot)
+                for slot, count in shared.items() if count >= needed
+            ))
+            return [self.recipes[-slot] for _, _, slot in best]
@@ -0,0 +1,111 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from metrics import metrics
+
+
+class TranslationCache:
+    """Cache persistant des traductions (SQLite) avec un LRU mémoire en façade
+
+    Les traductions épinglées (recettes favorites) ne sont jamais évincées.
+    """
+
+    def __init__(self, db_path="translations.db", memory_items=512, max_bytes=20 * 1024 * 1024):
+        self.db_path = db_path
+        self.memory_items = memory_items
+        self.max_bytes = max_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('''CREATE TABLE IF NOT EXISTS translations
+                            (key TEXT PRIMARY KEY,
+                             src TEXT,
+                             dest TEXT,
+                             translated TEXT,
+                             size INTEGER,
+                             accessed_at REAL,
+                             pinned INTEGER DEFAULT 0)''')
+        self._conn.execute('''CREATE INDEX IF NOT EXISTS translations_lru
+                            ON translations (pinned, accessed_at)''')
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(src, dest, text):
+        """Empreinte de (langue source, langue cible, texte)"""
+        raw = json.dumps([src, dest, text], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, src, dest, text):
+        """Renvoie la traduction en cache, ou None"""
+        key = self.make_key(src, dest, text)
+        with self._lock:
+            translated = self._memory.get(key)
+            if translated is not None:
+                self._memory.move_to_end(key)
+                metrics.cache("translation", "memory")
+                return translated
+
+            row = self._conn.execute('SELECT translated FROM translations WHERE key = ?',
+                                     (key,)).fetchone()
+            if not row:
+                metrics.cache("translation", "miss")
+                return None
+            metrics.cache("translation", "disk")
+            self._conn.execute('UPDATE translations SET accessed_at = ? WHERE key = ?',
+                               (time.time(), key))
+            self._conn.commit()
+            self._remember(key, row[0])
+            return row[0]
+
+    def put(self, src, dest, text, translated, pinned=False):
+        """Enregistre une traduction"""
+        key = self.make_key(src, dest, text)
+        size = len(translated.encode("utf-8"))
+        with self._lock, metrics.span("sqlite.write", table="translations"):
+            self._conn.execute('''INSERT INTO translations
+                                VALUES (?, ?, ?, ?, ?, ?, ?)
+                                ON CONFLICT(key) DO UPDATE SET
+                                    translated = excluded.translated,
+                                    size = excluded.size,
+                                    accessed_at = excluded.accessed_at,
+                                    pinned = MAX(pinned, excluded.pinned)''',
+                               (key, src, dest, translated, size, time.time(), int(pinned)))
+            self._evict()
+            self._conn.commit()
+            self._remember(key, translated)
+
+    def pin(self, src, dest, texts, pinned=True):
+        """Épingle (ou désépingle) les traductions des textes donnés"""
+        keys = [(int(pinned), self.make_key(src, dest, text)) for text in texts]
+        with self._lock:
+            self._conn.executemany('UPDATE translations SET pinned = ? WHERE key = ?', keys)
+            self._conn.commit()
+
+    def _remember(self, key, translated):
+        self._memory[key] = translated
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _evict(self):
+        """Supprime les traductions non épinglées les moins utilisées au-delà de max_bytes"""
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM translations').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute('''SELECT key, size FROM translations
+                                   WHERE pinned = 0 ORDER BY accessed_at''').fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute('DELETE FROM translations WHERE key = ?', (key,))
+            self._memory.pop(key, None)
+            total -= size
+
+    def close(self):
+        """Ferme la connexion SQLite"""
+        with self._lock:
+            self._conn.close()
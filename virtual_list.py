@@ -0,0 +1,161 @@
+import tkinter as tk
+from tkinter import ttk
+
+from metrics import metrics
+
+
+class VirtualList:
+    """Liste virtualisée : le Listbox ne contient que les lignes visibles
+
+    items est une séquence partagée avec l'appelant et label(item) donne le
+    libellé d'une ligne. Les lignes de la fenêtre visible sont remplies par
+    tranches de chunk_size via after(), la première tout de suite ; un
+    nouveau défilement annule les tranches en attente. La barre de
+    défilement et on_scroll(first, last) travaillent sur toute la séquence.
+    """
+
+    def __init__(self, parent, label, on_select=None, on_scroll=None, chunk_size=20, **listbox_options):
+        self.label = label
+        self.on_select = on_select
+        self.on_scroll = on_scroll
+        self.chunk_size = chunk_size
+        self.items = []
+        self.top = 0
+        self.visible = int(listbox_options.get("height", 10))
+        self.selected = None
+        self._render_job = None
+
+        self.frame = ttk.Frame(parent)
+        self.listbox = tk.Listbox(self.frame, exportselection=False, **listbox_options)
+        self.scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.listbox.bind("<<ListboxSelect>>", self._on_listbox_select)
+        self.listbox.bind("<Configure>", self._on_configure)
+        self.listbox.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1, "units", 3))
+        self.listbox.bind("<Button-4>", lambda e: self.scroll(-1, "units", 3))
+        self.listbox.bind("<Button-5>", lambda e: self.scroll(1, "units", 3))
+        self.listbox.bind("<Up>", lambda e: self.move_selection(-1))
+        self.listbox.bind("<Down>", lambda e: self.move_selection(1))
+        self.listbox.bind("<Prior>", lambda e: self.move_selection(-self.visible))
+        self.listbox.bind("<Next>", lambda e: self.move_selection(self.visible))
+        self.listbox.bind("<Home>", lambda e: self.move_selection(-len(self.items)))
+        self.listbox.bind("<End>", lambda e: self.move_selection(len(self.items)))
+
+    def pack(self, **options):
+        self.frame.pack(**options)
+
+    def config(self, **options):
+        """Options du Listbox (couleurs, police)"""
+        self.listbox.config(**options)
+
+    def set_items(self, items):
+        """Affiche une nouvelle séquence, depuis le début"""
+        self.items = items
+        self.top = 0
+        self.selected = None
+        self.render()
+
+    def refresh(self):
+        """Prend en compte des éléments ajoutés ou des libellés modifiés"""
+        self.top = max(0, min(self.top, len(self.items) - self.visible))
+        self.render()
+
+    def selected_index(self):
+        """Indice de l'élément sélectionné dans la séquence, ou None"""
+        return self.selected
+
+    def render(self):
+        """Remplit les lignes visibles : première tranche tout de suite, les autres via after()"""
+        if self._render_job is not None:
+            self.listbox.after_cancel(self._render_job)
+            self._render_job = None
+        self.listbox.delete(0, tk.END)
+        end = min(len(self.items), self.top + self.visible)
+        self._render_chunk(self.top, end)
+        self._update_scrollbar()
+
+    def _render_chunk(self, start, end):
+        self._render_job = None
+        stop = min(end, start + self.chunk_size)
+        with metrics.span("ui.list_chunk"):
+            self.listbox.insert(tk.END, *(self.label(item) for item in self.items[start:stop]))
+        if self.selected is not None and start <= self.selected < stop:
+            self.listbox.selection_set(self.selected - self.top)
+        if stop < end:
+            self._render_job = self.listbox.after(0, self._render_chunk, stop, end)
+        elif start == self.top and self.items:
+            self.listbox.after_idle(self._fit_rows)
+
+    def _update_scrollbar(self):
+        count = len(self.items)
+        if count:
+            first, last = self.top / count, min(1.0, (self.top + self.visible) / count)
+        else:
+            first, last = 0.0, 1.0
+        self.scrollbar.set(first, last)
+        if self.on_scroll is not None:
+            self.on_scroll(first, last)
+
+    def scroll_to(self, top):
+        """Place l'élément top en haut de la fenêtre"""
+        top = max(0, min(top, len(self.items) - self.visible))
+        if top != self.top:
+            self.top = top
+            self.render()
+
+    def scroll(self, amount, what="units", step=1):
+        """Défilement relatif, en lignes ou en pages"""
+        amount = int(amount)
+        lines = amount * self.visible if what.startswith("page") else amount * step
+        self.scroll_to(self.top + lines)
+        return "break"
+
+    def on_scrollbar(self, command, *args):
+        """Commande de la barre de défilement ("moveto" ou "scroll")"""
+        if command == "moveto":
+            self.scroll_to(round(float(args[0]) * len(self.items)))
+        elif command == "scroll":
+            self.scroll(args[0], args[1])
+
+    def move_selection(self, offset):
+        """Déplace la sélection au clavier, en faisant défiler si besoin"""
+        if not self.items:
+            return "break"
+        current = self.top if self.selected is None else self.selected
+        index = max(0, min(len(self.items) - 1, current + offset))
+        if index < self.top:
+            self.scroll_to(index)
+        elif index >= self.top + self.visible:
+            self.scroll_to(index - self.visible + 1)
+        self.select(index)
+        return "break"
+
+    def select(self, index):
+        """Sélectionne l'élément index et prévient on_select"""
+        self.selected = index
+        self.listbox.selection_clear(0, tk.END)
+        if self.top <= index < self.top + self.visible:
+            self.listbox.selection_set(index - self.top)
+        if self.on_select is not None:
+            self.on_select(index)
+
+    def _on_listbox_select(self, event):
+        selection = self.listbox.curselection()
+        if selection and self.top + selection[0] != self.selected:
+            self.select(self.top + selection[0])
+
+    def _on_configure(self, event):
+        self._fit_rows()
+
+    def _fit_rows(self):
+        """Ajuste le nombre de lignes visibles à la hauteur du Listbox"""
+        first, second = self.listbox.bbox(0), self.listbox.bbox(1)
+        if not first:
+            return
+        pitch = second[1] - first[1] if second else first[3] + 1
+        visible = max(1, self.listbox.winfo_height() // pitch)
+        if visible != self.visible:
+            self.visible = visible
+            self.refresh()